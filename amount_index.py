@@ -0,0 +1,59 @@
+import numpy as np
+
+from frame_cache import per_frame
+from schema import LABEL_COLUMN
+
+
+class AmountIndex:
+    """Rows sorted by ``Amount`` with cumulative fraud/legit counts.
+
+    Built once per frame in O(n log n). Afterwards the counts for any
+    amount range are two binary searches and two prefix-sum lookups.
+    """
+
+    def __init__(self, amounts, labels):
+        self.order = np.argsort(amounts, kind="stable")
+        self.sorted_amounts = amounts[self.order]
+        self.sorted_is_fraud = labels[self.order] == 1
+        self.sorted_is_legit = labels[self.order] == 0
+
+        # prefix[i] = number of rows among the first i sorted rows
+        self.fraud_prefix = np.zeros(len(amounts) + 1, dtype=np.int64)
+        np.cumsum(self.sorted_is_fraud, out=self.fraud_prefix[1:])
+        self.legit_prefix = np.zeros(len(amounts) + 1, dtype=np.int64)
+        np.cumsum(self.sorted_is_legit, out=self.legit_prefix[1:])
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(df["Amount"].to_numpy(), df[LABEL_COLUMN].to_numpy())
+
+    def __len__(self):
+        return len(self.order)
+
+    def amount_range(self):
+        """Smallest and largest non-NaN amount (NaNs sort last)."""
+        scalar = self.sorted_amounts.dtype.type
+        valid = int(np.searchsorted(self.sorted_amounts, scalar(np.nan), side="left"))
+        if valid == 0:
+            return 0.0, 0.0
+        return float(self.sorted_amounts[0]), float(self.sorted_amounts[valid - 1])
+
+    def bounds(self, low, high):
+        """Sorted-order slice ``[lo, hi)`` covering ``low <= Amount <= high``."""
+        # Cast the bounds to the array dtype; searching a float32 array with
+        # a Python float would otherwise convert the whole array first.
+        scalar = self.sorted_amounts.dtype.type
+        lo = int(np.searchsorted(self.sorted_amounts, scalar(low), side="left"))
+        hi = int(np.searchsorted(self.sorted_amounts, scalar(high), side="right"))
+        return lo, max(lo, hi)
+
+    def counts(self, low, high, types=("Legitimate", "Fraudulent")):
+        lo, hi = self.bounds(low, high)
+        fraud = int(self.fraud_prefix[hi] - self.fraud_prefix[lo]) if "Fraudulent" in types else 0
+        legit = int(self.legit_prefix[hi] - self.legit_prefix[lo]) if "Legitimate" in types else 0
+        return {"total": fraud + legit, "fraud": fraud, "legit": legit}
+
+
+def amount_index(df):
+    """Return the (cached) :class:`AmountIndex` for ``df``."""
+    return per_frame(df, "amount_index", AmountIndex.from_frame)
@@ -1,5 +1,16 @@
+import time
+
 import streamlit as st
-import pandas as pd
+
+from dataset_store import open_dataset, publish, store_stats
+from frame_cache import per_frame
+from ingest import (CSV_ENGINES, DEFAULT_CHUNK_ROWS, DEFAULT_MEMORY_BUDGET_MB, default_engine, retained_budget_bytes,
+                    stream_csv)
+from preflight import validate_csv
+from schema import memory_report
+from scoring import (PREDICTION_COLUMN, SCORE_COLUMN, expected_features, load_cascade, load_model,
+                     missing_features, model_available, score_frame, scoring_variant)
+from upload_cache import cache_stats, frame_stats, load_upload, store_upload, upload_digest
 
 # --- Page Config ---
 st.set_page_config(
@@ -340,79 +351,196 @@ uploaded_file = st.file_uploader(
 
 st.markdown("</div>", unsafe_allow_html=True)
 
+# --- Ingest Options ---
+with st.expander("Ingest options"):
+    streaming_mode = st.checkbox(
+        "Streaming ingest (large files)",
+        value=False,
+        help="Read the file in chunks so memory stays bounded; metrics update as chunks arrive"
+    )
+    ingest_col1, ingest_col2 = st.columns(2)
+    with ingest_col1:
+        chunk_rows = st.number_input("Rows per chunk", min_value=10_000, value=DEFAULT_CHUNK_ROWS, step=10_000)
+    with ingest_col2:
+        memory_budget_mb = st.number_input("Memory budget (MB)", min_value=128, value=DEFAULT_MEMORY_BUDGET_MB, step=128)
+    csv_engine = st.selectbox(
+        "CSV parser",
+        options=CSV_ENGINES,
+        index=CSV_ENGINES.index(default_engine()),
+        help="'pyarrow' parses with Arrow's multithreaded reader; 'c' is pandas' parser"
+    )
+    cascade_available = model_available() and load_cascade() is not None
+    use_cascade = st.checkbox(
+        "Two-stage cascade",
+        value=False,
+        disabled=not cascade_available,
+        help="Screen rows with the cheap first-stage model and send only suspicious ones to the full model "
+             "(train with `train_model.py --cascade`). Faster, but cleared rows score 0 and a little recall "
+             "is lost"
+    )
+
+
+def metric_card(label, value):
+    return f"""
+    <div class='metric-card'>
+        <div class='metric-label'>{label}</div>
+        <div class='metric-value'>{value}</div>
+    </div>
+    """
+
+
+def render_metrics(placeholders, stats):
+    fraud = f"{stats['fraud']:,}" if stats['has_class'] else "N/A"
+    legit = f"{stats['legit']:,}" if stats['has_class'] else "N/A"
+    placeholders[0].markdown(metric_card("Total Rows", f"{stats['rows']:,}"), unsafe_allow_html=True)
+    placeholders[1].markdown(metric_card("Total Columns", stats['columns']), unsafe_allow_html=True)
+    placeholders[2].markdown(metric_card("Fraudulent", fraud), unsafe_allow_html=True)
+    placeholders[3].markdown(metric_card("Legitimate", legit), unsafe_allow_html=True)
+
+
 # --- Process Uploaded File ---
 if uploaded_file is not None:
     try:
-        # Read the CSV file
-        df = pd.read_csv(uploaded_file)
-        
-        # Store in session state
-        st.session_state.uploaded_data = df
+        # Reject files that are not transaction data from the header and a
+        # small sample, before the upload is hashed or parsed. The model's
+        # features come from its metadata file, so nothing is loaded yet
+        preflight = validate_csv(uploaded_file, expected_features=expected_features())
+        if not preflight['ok']:
+            st.error("This file cannot be analysed:\n\n" + "\n".join(f"- {error}" for error in preflight['errors']))
+            st.stop()
+        for warning in preflight['warnings']:
+            st.warning(warning)
         
-        # Display success message
-        
-        st.success(f"File uploaded successfully! Loaded {len(df):,} transactions")
+        status = st.empty()
+        score_caption = st.empty()
         st.markdown("</div>", unsafe_allow_html=True)
         
         # Show data preview
         st.markdown("### Data Preview")
         
-        col1, col2, col3, col4 = st.columns(4)
+        placeholders = [col.empty() for col in st.columns(4)]
         
-        with col1:
-            st.markdown(f"""
-            <div class='metric-card'>
-                <div class='metric-label'>Total Rows</div>
-                <div class='metric-value'>{len(df):,}</div>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown("<br>", unsafe_allow_html=True)
         
-        with col2:
-            st.markdown(f"""
-            <div class='metric-card'>
-                <div class='metric-label'>Total Columns</div>
-                <div class='metric-value'>{len(df.columns)}</div>
-            </div>
-            """, unsafe_allow_html=True)
+        preview = st.empty()
         
-        with col3:
-            if 'Class' in df.columns:
-                fraud_count = (df['Class'] == 1).sum()
-                st.markdown(f"""
-                <div class='metric-card'>
-                    <div class='metric-label'>Fraudulent</div>
-                    <div class='metric-value'>{fraud_count:,}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown("""
-                <div class='metric-card'>
-                    <div class='metric-label'>Fraudulent</div>
-                    <div class='metric-value'>N/A</div>
-                </div>
-                """, unsafe_allow_html=True)
+        # Score each chunk with the trained model before it is retained
+        # (the model itself is loaded on the first chunk, once per process)
+        scoring = {"enabled": model_available() and not preflight['missing_features'], "model": None, "cascade": None,
+                   "rows": 0, "seconds": 0.0, "predicted_fraud": 0, "short_circuited": 0}
         
-        with col4:
-            if 'Class' in df.columns:
-                legit_count = (df['Class'] == 0).sum()
-                st.markdown(f"""
-                <div class='metric-card'>
-                    <div class='metric-label'>Legitimate</div>
-                    <div class='metric-value'>{legit_count:,}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown("""
-                <div class='metric-card'>
-                    <div class='metric-label'>Legitimate</div>
-                    <div class='metric-value'>N/A</div>
-                </div>
-                """, unsafe_allow_html=True)
+        def score_chunk(chunk):
+            if not scoring["enabled"]:
+                return chunk
+            if scoring["model"] is None:
+                scoring["model"] = load_model()
+                scoring["cascade"] = load_cascade() if use_cascade else None
+            missing = missing_features(chunk, scoring["model"])
+            if missing:
+                st.warning(f"Skipping model scoring, missing feature columns: {', '.join(missing)}")
+                scoring["enabled"] = False
+                return chunk
+            chunk, chunk_stats = score_frame(chunk, scoring["model"], cascade=scoring["cascade"])
+            for key in ("rows", "seconds", "predicted_fraud", "short_circuited"):
+                scoring[key] += chunk_stats[key]
+            return chunk
         
-        st.markdown("<br>", unsafe_allow_html=True)
+        def on_chunk(stats, chunk):
+            # Build the preview from the first chunk only
+            if stats['chunks'] == 1:
+                preview.dataframe(chunk.head(10), use_container_width=True, height=300)
+            render_metrics(placeholders, stats)
+            if streaming_mode:
+                status.info(f"Reading... {stats['rows']:,} rows so far (peak memory {stats['peak_rss_mb']:,.0f} MB)")
         
-        # Display first few rows
-        st.dataframe(df.head(10), use_container_width=True, height=300)
+        # Repeat uploads (or the same file from another tab) are served from
+        # the content-addressed cache and skip parsing; scores are always
+        # recomputed since they depend on the selected model
+        digest = upload_digest(uploaded_file)
+        cache_start = time.perf_counter()
+        # If another session already parsed and scored this file with the
+        # same model, reuse its shared frame and skip both steps. With
+        # streaming on, cached frames are only used if they fit the memory
+        # budget; otherwise the file is streamed (and truncated) as usual
+        budget = retained_budget_bytes(memory_budget_mb) if streaming_mode else None
+        dataset_key = f"{digest}-{scoring_variant(cascade=use_cascade)}"
+        df = open_dataset(dataset_key)
+        if df is not None and budget is not None and df.memory_usage(index=True, deep=True).sum() > budget:
+            df = None
+        shared_hit = df is not None
+        if not shared_hit:
+            df = load_upload(digest, max_bytes=budget)
+        cache_hit = df is not None
+        if cache_hit:
+            cache_seconds = time.perf_counter() - cache_start
+            if not shared_hit:
+                df = score_chunk(df)
+            ingest_stats = frame_stats(df)
+            on_chunk(ingest_stats, df)
+        else:
+            # Read the CSV file
+            df, ingest_stats = stream_csv(
+                uploaded_file,
+                chunk_rows=int(chunk_rows) if streaming_mode else None,
+                memory_budget_mb=memory_budget_mb,
+                transform=score_chunk,
+                on_chunk=on_chunk,
+                engine=csv_engine
+            )
+            if not ingest_stats['truncated']:
+                store_upload(
+                    digest,
+                    df.drop(columns=[SCORE_COLUMN, PREDICTION_COLUMN], errors='ignore'),
+                    source_bytes=uploaded_file.size,
+                    parse_seconds=ingest_stats['seconds'] - scoring['seconds']
+                )
+        if not ingest_stats['truncated']:
+            # Sessions keep the shared read-only frame, not a private copy,
+            # so server memory grows with distinct datasets rather than users
+            # (a truncated frame depends on this session's budget; it stays private)
+            df = publish(dataset_key, df)
+        
+        # Store in session state
+        st.session_state.uploaded_data = df
+        
+        # Display success message
+        status.success(f"File uploaded successfully! Loaded {len(df):,} transactions")
+        if ingest_stats['truncated']:
+            st.warning(
+                f"Memory budget reached: metrics cover all {ingest_stats['rows']:,} rows, "
+                f"but only the first {ingest_stats['retained_rows']:,} are kept for the dashboard."
+            )
+        cache = cache_stats()
+        if shared_hit:
+            cache_result = f"Shared dataset: opened in {cache_seconds * 1000:,.0f} ms, already parsed and scored"
+        elif cache_hit:
+            cache_result = f"Upload cache hit: loaded in {cache_seconds * 1000:,.0f} ms without parsing"
+        else:
+            cache_result = "Upload cache miss: parsed from CSV"
+        st.caption(
+            f"{cache_result}. Server totals: {cache['hits']:,} hits, {cache['misses']:,} misses, "
+            f"{cache['bytes_saved'] / 1024 ** 2:,.1f} MB / {cache['seconds_saved']:,.1f}s of parsing saved; "
+            f"{cache['entries']:,} files, {cache['bytes'] / 1024 ** 2:,.1f} MB cached on disk"
+        )
+        shared = store_stats()
+        st.caption(
+            f"Shared across sessions: {shared['datasets']:,} datasets, {shared['rows']:,} rows, "
+            f"{shared['bytes'] / 1024 ** 2:,.1f} MB memory-mapped"
+        )
+        mem = per_frame(df, "memory_report", memory_report)
+        st.caption(
+            f"In memory: {mem['bytes'] / 1024 ** 2:,.1f} MB ({mem['bytes_per_row']:.0f} B/row), "
+            f"{mem['ratio']:.0%} of {mem['default_bytes_per_row']:.0f} B/row with default dtypes"
+        )
+        if scoring['rows']:
+            rows_per_sec = scoring['rows'] / scoring['seconds'] if scoring['seconds'] > 0 else float('inf')
+            score_caption.caption(
+                f"Scored {scoring['rows']:,} rows in {scoring['seconds']:.2f}s "
+                f"({rows_per_sec:,.0f} rows/sec) - "
+                f"{scoring['predicted_fraud']:,} predicted fraudulent"
+                + (f", {scoring['short_circuited'] / scoring['rows']:.1%} cleared by the first stage"
+                   if scoring['cascade'] is not None else "")
+            )
         
         st.markdown("<br>", unsafe_allow_html=True)
         
@@ -0,0 +1,206 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from ingest import CSV_ENGINES, iter_csv
+from preflight import check_csv
+from scoring import (DEFAULT_CHUNK_SIZE, DEFAULT_THRESHOLD, SCORE_COLUMN, default_model_path,
+                     load_cascade, load_model, model_features, score_frame)
+
+# Usage: python batch_score.py "incoming/*.csv" [more dirs or globs] --out-dir scored [--workers 8]
+#
+# Every input file is scored by one worker process and written as
+# <out-dir>/<name>.parquet; per-file summaries and the aggregate throughput
+# go to <out-dir>/summary.json.
+
+DEFAULT_OUT_DIR = "scored"
+DEFAULT_BINS = 20
+
+# --- Worker state ---
+# Set once per worker process by _init_worker, so each process loads the
+# model a single time and reuses it for every file it is given.
+_worker = {}
+
+
+def expand_inputs(patterns):
+    """CSV paths named by files, directories or glob patterns, sorted and de-duplicated."""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.update(glob.glob(os.path.join(pattern, "*.csv")))
+        else:
+            paths.update(p for p in glob.glob(pattern) if os.path.isfile(p))
+    return sorted(paths)
+
+
+def _init_worker(model_path, threads, use_cascade):
+    model = load_model(model_path)
+    # Workers split the cores between them; letting every booster use all
+    # of them would oversubscribe the machine and stop the pool scaling
+    if hasattr(model, "get_booster"):
+        model.get_booster().set_param({"nthread": threads})
+    _worker["model"] = model
+    _worker["cascade"] = load_cascade(model_path) if use_cascade else None
+
+
+def score_file(path, out_dir, chunk_rows=DEFAULT_CHUNK_SIZE, threshold=DEFAULT_THRESHOLD, bins=DEFAULT_BINS,
+               engine=None):
+    """Score one CSV chunk by chunk into ``out_dir/<name>.parquet``; returns its summary.
+
+    The file is preflighted first, so a malformed one fails with the same
+    ``ValueError`` as in the app and the trainer, before any output is written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    start = time.perf_counter()
+    model, cascade = _worker["model"], _worker["cascade"]
+    out_path = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + ".parquet")
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    histogram = np.zeros(bins, dtype=np.int64)
+    rows = predicted_fraud = 0
+
+    check_csv(path, expected_features=model_features(model), require_features=True)
+
+    # Known columns are parsed straight to their CSV_DTYPES, so every chunk
+    # has the same schema and nothing is downcast afterwards
+    tmp_path = out_path + ".tmp"
+    writer = None
+    try:
+        for chunk in iter_csv(path, chunk_rows, engine):
+            chunk, stats = score_frame(chunk, model, threshold=threshold, cascade=cascade)
+            rows += stats["rows"]
+            predicted_fraud += stats["predicted_fraud"]
+            histogram += np.histogram(chunk[SCORE_COLUMN].to_numpy(), bins=edges)[0]
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+            writer = None
+            os.replace(tmp_path, out_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return {
+        "file": path,
+        "output": out_path if rows else None,
+        "rows": rows,
+        "predicted_fraud": predicted_fraud,
+        "histogram": {"edges": edges.tolist(), "counts": histogram.tolist()},
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _score_file_safely(path, out_dir, chunk_rows, threshold, bins, engine):
+    try:
+        return score_file(path, out_dir, chunk_rows, threshold, bins, engine)
+    except Exception as exc:
+        return {"file": path, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def score_files(paths, out_dir, model_path=None, workers=None,
+                chunk_rows=DEFAULT_CHUNK_SIZE, threshold=DEFAULT_THRESHOLD, bins=DEFAULT_BINS,
+                use_cascade=False, engine=None, on_result=None):
+    """Score ``paths`` over a process pool; returns ``(summaries, stats)``.
+
+    Files are handed out one at a time, largest first, so a big file does
+    not end up alone at the tail of the run. A file that fails to score is
+    reported in its summary instead of stopping the batch.
+    """
+    start = time.perf_counter()
+    model_path = model_path or default_model_path()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    os.makedirs(out_dir, exist_ok=True)
+
+    ordered = sorted(paths, key=os.path.getsize, reverse=True)
+    summaries = []
+    # spawn keeps the workers free of any OpenMP state inherited from the parent
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker,
+                             initargs=(model_path, threads, use_cascade)) as pool:
+        futures = [pool.submit(_score_file_safely, path, out_dir, chunk_rows, threshold, bins, engine)
+                   for path in ordered]
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries.append(summary)
+            if on_result is not None:
+                on_result(summary)
+
+    elapsed = time.perf_counter() - start
+    rows = sum(s.get("rows", 0) for s in summaries)
+    summaries.sort(key=lambda s: s["file"])
+    stats = {
+        "files": len(summaries),
+        "failed": sum("error" in s for s in summaries),
+        "rows": rows,
+        "predicted_fraud": sum(s.get("predicted_fraud", 0) for s in summaries),
+        "workers": workers,
+        "threads_per_worker": threads,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed > 0 else float("inf"),
+    }
+    return summaries, stats
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Score many transaction CSVs in parallel")
+    parser.add_argument("inputs", nargs="+", help="CSV files, directories or glob patterns")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument("--model", default=None, help="Model file (default: the app's model)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--csv-engine", choices=CSV_ENGINES, default=None,
+                        help="CSV parser (default: pyarrow when installed, else pandas' C parser)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS, help="Score histogram bins per file")
+    parser.add_argument("--cascade", action="store_true", help="Use the two-stage cascade next to the model")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("no CSV files matched")
+    if args.cascade and load_cascade(args.model) is None:
+        parser.error("no cascade next to the model; train with `train_model.py --cascade`")
+
+    def report(summary):
+        if "error" in summary:
+            print(f"FAILED {summary['file']}: {summary['error']}")
+        else:
+            print(f"{summary['file']}: {summary['rows']:,} rows, {summary['predicted_fraud']:,} predicted fraud "
+                  f"({summary['seconds']:.2f}s)")
+
+    summaries, stats = score_files(
+        paths, args.out_dir, model_path=args.model, workers=args.workers,
+        chunk_rows=args.chunk_rows, threshold=args.threshold, bins=args.bins,
+        use_cascade=args.cascade, engine=args.csv_engine, on_result=report,
+    )
+
+    summary_path = os.path.join(args.out_dir, "summary.json")
+    with open(summary_path, "w") as f:
+        json.dump({"stats": stats, "files": summaries}, f, indent=2)
+    print(f"Scored {stats['rows']:,} rows from {stats['files'] - stats['failed']} of {stats['files']} files "
+          f"in {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec, {stats['workers']} workers)")
+    print(f"Summary written to {summary_path}")
+    if stats["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
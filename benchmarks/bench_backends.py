@@ -0,0 +1,63 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from compiled_model import CompiledForest, check_equivalence
+from scoring import LEGACY_MODEL_PATH, load_model
+
+# Usage: python -m benchmarks.bench_backends [--model model/fraud_model.pkl]
+#
+# Checks that the compiled backend reproduces the booster's margins exactly
+# and its probabilities within --max-ulps, then compares single-row and
+# 10k-row latency per backend.
+
+
+def latency(predict, X, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        timings.append(time.perf_counter() - start)
+    return np.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference backend equivalence and latency")
+    parser.add_argument("--model", default=LEGACY_MODEL_PATH, help="Pickled XGBClassifier")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows for the equivalence check")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--max-ulps", type=int, default=1,
+                        help="Allowed probability difference in float32 ulps (expf rounding varies by libm)")
+    args = parser.parse_args()
+
+    sklearn_model = load_model(args.model)
+    booster = sklearn_model.get_booster()
+    forest = CompiledForest.from_booster(booster)
+
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((args.rows, len(forest.feature_names_in_))).astype(np.float32)
+    X[rng.random(X.shape) < 0.01] = np.nan
+
+    diff = check_equivalence(booster, forest, X)
+    print(f"equivalence on {args.rows:,} rows: max |margin diff| = {diff['margin']:g}, "
+          f"max |proba diff| = {diff['proba']:g} ({diff['proba_ulps']} ulp)")
+    if diff["margin"] != 0.0 or diff["proba_ulps"] > args.max_ulps:
+        print("compiled backend does not match the booster", file=sys.stderr)
+        sys.exit(1)
+
+    backends = {
+        "sklearn wrapper": lambda rows: sklearn_model.predict_proba(rows),
+        "booster inplace": lambda rows: booster.inplace_predict(rows, validate_features=False),
+        "numpy compiled": lambda rows: forest.predict_proba(rows),
+    }
+    print(f"{'backend':>16} {'1 row':>12} {'10k rows':>12}")
+    for name, predict in backends.items():
+        single = latency(predict, X[:1], args.repeat)
+        batch = latency(predict, X[:10_000], max(args.repeat // 20, 3))
+        print(f"{name:>16} {single * 1e6:>9.1f} us {batch * 1000:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import os
+import tempfile
+
+from batch_score import expand_inputs, score_files
+from benchmarks.synthetic_data import write_csv
+
+# Usage: python -m benchmarks.bench_batch_scoring [--files 8] [--rows 200000] [--workers 1 2 4 8]
+#
+# Writes synthetic daily files (or uses --inputs) and scores them with each
+# worker count; speedup is relative to the first count given.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch scoring scaling with worker processes")
+    parser.add_argument("--inputs", nargs="*", default=None, help="Existing CSVs/dirs/globs to score")
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows per synthetic file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--model", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.inputs:
+            paths = expand_inputs(args.inputs)
+        else:
+            paths = [os.path.join(tmp, f"day{i:02d}.csv") for i in range(args.files)]
+            for seed, path in enumerate(paths):
+                write_csv(path, args.rows, seed=seed)
+
+        print(f"{len(paths)} files, cpu count {os.cpu_count()}")
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            _, stats = score_files(paths, os.path.join(tmp, f"out{workers}"), model_path=args.model,
+                                   workers=workers)
+            baseline = baseline or stats["rows_per_sec"]
+            print(f"workers: {stats['workers']:>3}  threads/worker: {stats['threads_per_worker']:>2}  "
+                  f"time: {stats['seconds']:6.2f}s  throughput: {stats['rows_per_sec']:>12,.0f} rows/sec  "
+                  f"speedup: {stats['rows_per_sec'] / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
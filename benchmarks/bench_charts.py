@@ -0,0 +1,68 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from amount_index import AmountIndex
+from chart_aggregates import amount_box_stats, amount_histogram
+from schema import compact_frame
+
+# Usage: python -m benchmarks.bench_charts [--rows 100000 1000000]
+
+TYPES = ["Legitimate", "Fraudulent"]
+
+
+def row_level_figures(df):
+    fig3 = px.histogram(df, x="Amount", color="Transaction Type", nbins=50, barmode="overlay")
+    fig4 = px.box(df, x="Transaction Type", y="Amount", color="Transaction Type", points="outliers")
+    return fig3, fig4
+
+
+def aggregated_figures(index, low, high):
+    hist = amount_histogram(index, low, high, TYPES)
+    edges = hist["edges"]
+    fig3 = go.Figure([
+        go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=edges[1] - edges[0], name=name)
+        for name, counts in hist["counts"].items()
+    ])
+    fig4 = go.Figure()
+    for name, stats in amount_box_stats(index, low, high, TYPES).items():
+        fig4.add_trace(go.Box(x=[name], q1=[stats["q1"]], median=[stats["median"]], q3=[stats["q3"]],
+                              lowerfence=[stats["lowerfence"]], upperfence=[stats["upperfence"]]))
+        fig4.add_trace(go.Scatter(x=[name] * len(stats["outliers"]), y=stats["outliers"], mode="markers"))
+    return fig3, fig4
+
+
+def measure(build):
+    start = time.perf_counter()
+    figures = build()
+    payload = sum(len(fig.to_json()) for fig in figures)
+    return time.perf_counter() - start, payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-level vs aggregated amount charts")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>12} {'approach':>11} {'build+json':>12} {'payload':>14}")
+    for rows in args.rows:
+        df = compact_frame(pd.DataFrame({
+            "Amount": rng.exponential(88.0, rows).round(2),
+            "Class": (rng.random(rows) < 0.0017).astype(np.int64),
+        }))
+        low, high = float(df["Amount"].min()), float(df["Amount"].max())
+        index = AmountIndex.from_frame(df)
+
+        for name, build in (("rows", lambda: row_level_figures(df)),
+                            ("aggregates", lambda: aggregated_figures(index, low, high))):
+            seconds, payload = measure(build)
+            print(f"{rows:>12,} {name:>11} {seconds * 1000:>9.1f} ms {payload:>11,} B")
+
+
+if __name__ == "__main__":
+    main()
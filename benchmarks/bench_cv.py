@@ -0,0 +1,50 @@
+import argparse
+import os
+
+import numpy as np
+
+from benchmarks.synthetic_data import generate_chunk
+from evaluation import cross_validate
+from schema import FEATURE_COLUMNS, LABEL_COLUMN
+
+# Usage: python -m benchmarks.bench_cv [--rows 10000000] [--folds 5] [--parallel 1 5]
+#
+# Builds the synthetic matrix in memory (no CSV parse) and times the whole
+# cross-validation for each parallelism setting.
+
+
+def synthetic_matrix(rows, fraud_rate, seed=0, chunk_rows=1_000_000):
+    rng = np.random.default_rng(seed)
+    X = np.empty((rows, len(FEATURE_COLUMNS)), dtype=np.float32)
+    y = np.empty(rows, dtype=np.int8)
+    for start in range(0, rows, chunk_rows):
+        chunk = generate_chunk(rng, start, min(chunk_rows, rows - start), fraud_rate)
+        X[start:start + len(chunk)] = chunk[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+        y[start:start + len(chunk)] = chunk[LABEL_COLUMN].to_numpy()
+    return X, y
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validation wall time")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--fraud-rate", type=float, default=0.0017)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    X, y = synthetic_matrix(args.rows, args.fraud_rate)
+    print(f"rows: {args.rows:,}  frauds: {int(y.sum()):,}  matrix: {X.nbytes / 1024 ** 2:,.0f} MB  "
+          f"cpu count: {os.cpu_count()}")
+    for parallel in sorted(set(args.parallel)):
+        folds, summary = cross_validate(X, y, num_boost_round=args.n_estimators, n_folds=args.folds,
+                                        parallel=parallel)
+        print(f"parallel {summary['parallel']} x {summary['threads_per_fold']} threads: "
+              f"{summary['seconds']:.1f}s total, fold {summary['fold_seconds']['mean']:.1f}s "
+              f"(max {summary['fold_seconds']['max']:.1f}s)  "
+              f"AUC {summary['auc']['mean']:.5f} +/- {summary['auc']['std']:.5f}  "
+              f"PR-AUC {summary['pr_auc']['mean']:.5f} +/- {summary['pr_auc']['std']:.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from amount_index import AmountIndex
+from schema import compact_frame
+
+# Usage: python -m benchmarks.bench_filtering [--rows 10000000]
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Boolean-mask vs sorted-index KPI filtering")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = compact_frame(pd.DataFrame({
+        "Amount": rng.exponential(88.0, args.rows).round(2),
+        "Class": (rng.random(args.rows) < 0.0017).astype(np.int64),
+    }))
+    low, high = 10.0, 500.0
+    types = ["Legitimate", "Fraudulent"]
+
+    def with_mask():
+        filtered = df[df["Amount"].between(low, high) & df["Transaction Type"].isin(types)]
+        fraud = (filtered["Class"] == 1).sum()
+        return len(filtered), fraud, (filtered["Class"] == 0).sum()
+
+    start = time.perf_counter()
+    index = AmountIndex.from_frame(df)
+    build = time.perf_counter() - start
+
+    mask_time = best_of(with_mask, args.repeat)
+    index_time = best_of(lambda: index.counts(low, high, types), args.repeat)
+
+    print(f"rows: {args.rows:,}")
+    print(f"index build (once):     {build * 1000:10.2f} ms")
+    print(f"boolean masks + sums:   {mask_time * 1000:10.3f} ms")
+    print(f"index counts:           {index_time * 1000:10.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+from benchmarks.isolated import RunFailed, run_isolated
+from benchmarks.synthetic_data import write_csv
+from ingest import CSV_ENGINES
+
+# Usage:
+#   python -m benchmarks.bench_ingest --rows 100000 1000000 3000000 \
+#       [--engines pyarrow c inferred] [--output ingest_results.json]
+#
+# "inferred" is the old plain pd.read_csv (C parser, no dtypes) for
+# reference. Every parse runs in a fresh process so peak RSS is per run.
+
+BASELINE = "inferred"
+
+
+def _run_one(config, queue):
+    import pandas as pd
+
+    from ingest import current_rss_mb, peak_rss_mb, read_csv
+
+    before_mb = current_rss_mb()
+    start = time.perf_counter()
+    if config["engine"] == BASELINE:
+        df = pd.read_csv(config["data"])
+    else:
+        df = read_csv(config["data"], config["engine"])
+    seconds = time.perf_counter() - start
+
+    peak_mb = peak_rss_mb()
+    queue.put({
+        **config,
+        "seconds": seconds,
+        "peak_rss_mb": peak_mb,
+        "parse_overhead_mb": peak_mb - before_mb,
+        "frame_mb": df.memory_usage(index=True, deep=True).sum() / 1024 ** 2,
+        "parsed_rows": len(df),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV parse time and peak memory per engine and file size")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--engines", nargs="+", choices=CSV_ENGINES + (BASELINE,),
+                        default=list(CSV_ENGINES) + [BASELINE])
+    parser.add_argument("--fraud-rate", type=float, default=0.0017)
+    parser.add_argument("--data-dir", default=None, help="Where generated CSVs are kept (default: temp dir)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Seconds before a parse is abandoned (default: no limit)")
+    parser.add_argument("--output", default="ingest_results.json")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        for rows in args.rows:
+            data = os.path.join(data_dir, f"synthetic_{rows}_{args.fraud_rate}.csv")
+            if not os.path.exists(data):
+                write_csv(data, rows, args.fraud_rate)
+            file_mb = os.path.getsize(data) / 1024 ** 2
+
+            for engine in args.engines:
+                config = {"rows": rows, "file_mb": file_mb, "engine": engine, "data": data}
+                try:
+                    result = run_isolated(_run_one, config, args.timeout)
+                except RunFailed as exc:
+                    results.append({**config, "error": str(exc)})
+                    print(f"{rows:>10,} rows {file_mb:8.0f} MB  {engine:>8}  FAILED: {exc}")
+                    continue
+                results.append(result)
+                print(f"{rows:>10,} rows {file_mb:8.0f} MB  {engine:>8}  {result['seconds']:7.2f}s "
+                      f"({file_mb / result['seconds']:6.0f} MB/s)  peak {result['peak_rss_mb']:7.0f} MB "
+                      f"(+{result['parse_overhead_mb']:.0f})  frame {result['frame_mb']:6.0f} MB")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "machine": {"platform": platform.platform(), "cpus": os.cpu_count()},
+            "results": [{k: v for k, v in r.items() if k != "data"} for r in results],
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from model_store import native_path
+from scoring import LEGACY_MODEL_PATH
+
+# Usage: python -m benchmarks.bench_model_load [--model model/fraud_model.pkl]
+#
+# Each load runs in a fresh interpreter, so the timing includes the imports
+# a cold Streamlit process would pay on first scoring.
+
+COLD_LOAD = """
+import time
+start = time.perf_counter()
+from scoring import load_model
+load_model({path!r})
+print(time.perf_counter() - start)
+"""
+
+
+def cold_load_seconds(path, repeat):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", COLD_LOAD.format(path=path)],
+                             cwd=root, capture_output=True, text=True, check=True)
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start load time and size per model format")
+    parser.add_argument("--model", default=LEGACY_MODEL_PATH, help="Pickled model to convert and compare")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    import joblib
+
+    model = joblib.load(args.model)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"joblib pickle": os.path.abspath(args.model)}
+        for fmt in ("ubj", "json"):
+            path = native_path(os.path.join(tmp, "fraud_model.pkl"), fmt)
+            model.get_booster().save_model(path)
+            paths[f"native {fmt}"] = path
+
+        print(f"{'format':>14} {'size':>12} {'cold load':>12}")
+        for name, path in paths.items():
+            seconds = cold_load_seconds(path, args.repeat)
+            print(f"{name:>14} {os.path.getsize(path):>10,} B {seconds * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_cv import synthetic_matrix
+from row_pages import page_count, page_rows, row_pages
+from schema import FEATURE_COLUMNS, LABEL_COLUMN
+from scoring import SCORE_COLUMN
+
+# Usage: python -m benchmarks.bench_pages [--rows 10000000] [--page-size 50]
+#
+# Times fetching the first, a middle and the last page for each sort order,
+# once the orders are built.
+
+TYPES = ("Legitimate", "Fraudulent")
+
+
+def timed(fn, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Data explorer page fetch cost")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    X, y = synthetic_matrix(args.rows, 0.0017)
+    df = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+    df[LABEL_COLUMN] = y
+    df[SCORE_COLUMN] = np.random.default_rng(0).random(args.rows, dtype=np.float32)
+    del X
+
+    pages = row_pages(df)
+    low, high = float(df["Amount"].min()), float(df["Amount"].max())
+    for key in pages.sort_keys(df):
+        for fraud_only in (False, True):
+            start = time.perf_counter()
+            selection = pages.selection(df, key, low, high, TYPES, fraud_only=fraud_only, descending=True)
+            build = time.perf_counter() - start
+            last = page_count(selection, args.page_size)
+            cost = [timed(lambda p=p: page_rows(df, selection, p, args.page_size))[0]
+                    for p in (1, max(1, last // 2), last)]
+            print(f"{key:>12} {'fraud only' if fraud_only else 'all rows':>10}  "
+                  f"first use {build * 1000:8.1f} ms  pages 1 / {max(1, last // 2):,} / {last:,}: "
+                  + " / ".join(f"{c * 1000:.2f}" for c in cost) + " ms")
+
+
+if __name__ == "__main__":
+    main()
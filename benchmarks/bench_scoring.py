@@ -0,0 +1,53 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from scoring import (BACKENDS, DEFAULT_CHUNK_SIZE, PREDICTION_COLUMN, load_cascade, load_model, model_features,
+                     score_frame)
+
+# Usage: python -m benchmarks.bench_scoring [--rows 2000000] [--chunk-size 100000] [--cascade]
+#
+# --cascade scores the same rows with and without the first-stage model
+# written by `train_model.py --cascade`.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch scoring throughput")
+    parser.add_argument("--model", default=None, help="Defaults to the app's model file")
+    parser.add_argument("--backend", choices=BACKENDS, default="xgboost")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--cascade", action="store_true", help="Also score through the two-stage cascade")
+    parser.add_argument("--data", default=None,
+                        help="CSV to score instead of random rows (the cascade only helps on realistic data)")
+    args = parser.parse_args()
+
+    model = load_model(args.model, backend=args.backend)
+    features = model_features(model)
+
+    if args.data:
+        df = pd.read_csv(args.data, usecols=features, nrows=args.rows)
+    else:
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(rng.standard_normal((args.rows, len(features))), columns=features)
+
+    _, stats = score_frame(df, model, chunk_size=args.chunk_size)
+    print(f"rows: {stats['rows']:,}  chunk: {args.chunk_size:,}")
+    print(f"time: {stats['seconds']:.2f}s  throughput: {stats['rows_per_sec']:,.0f} rows/sec")
+
+    if args.cascade:
+        stage = load_cascade(args.model)
+        if stage is None:
+            parser.error("no cascade next to the model; train with `train_model.py --cascade`")
+        full_labels = df[PREDICTION_COLUMN].to_numpy().copy()
+        _, cascaded = score_frame(df, model, chunk_size=args.chunk_size, cascade=stage)
+        changed = int((full_labels != df[PREDICTION_COLUMN].to_numpy()).sum())
+        print(f"cascade: {cascaded['seconds']:.2f}s  throughput: {cascaded['rows_per_sec']:,.0f} rows/sec "
+              f"({cascaded['rows_per_sec'] / stats['rows_per_sec']:.1f}x)")
+        print(f"short-circuited: {cascaded['short_circuited'] / cascaded['rows']:.1%}  "
+              f"predicted fraud: {stats['predicted_fraud']:,} -> {cascaded['predicted_fraud']:,} ({changed:,} labels changed)")
+
+
+if __name__ == "__main__":
+    main()
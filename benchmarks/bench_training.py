@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+import joblib
+
+from benchmarks.isolated import RunFailed, run_isolated
+from benchmarks.synthetic_data import write_csv
+
+# Usage:
+#   python -m benchmarks.bench_training --rows 100000 300000 1000000 \
+#       --tree-methods hist approx --nthreads 1 4 --modes memory external \
+#       --output training_results.json
+#
+# Every configuration trains in a fresh process so peak RSS is per run.
+
+
+def _run_one(config, queue):
+    from ingest import peak_rss_mb
+    from train_model import build_parser, train
+
+    args = build_parser().parse_args([
+        "--data", config["data"],
+        "--mode", config["mode"],
+        "--tree-method", config["tree_method"],
+        "--nthread", str(config["nthread"]),
+        "--n-estimators", str(config["n_estimators"]),
+    ])
+    start = time.perf_counter()
+    model, metrics = train(args)
+    wall = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        joblib.dump(model, path)
+        model_bytes = os.path.getsize(path)
+
+    queue.put({
+        **config,
+        "wall_seconds": wall,
+        "peak_rss_mb": peak_rss_mb(),
+        "model_bytes": model_bytes,
+        "auc": float(metrics["auc"]),
+        "train_rows": int(metrics["train_rows"]),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Training cost across rows, tree methods and threads")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 300_000])
+    parser.add_argument("--fraud-rate", type=float, default=0.0017)
+    parser.add_argument("--tree-methods", nargs="+", default=["hist"])
+    parser.add_argument("--nthreads", type=int, nargs="+", default=[os.cpu_count() or 1])
+    parser.add_argument("--modes", nargs="+", choices=["memory", "external"], default=["memory"])
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--data-dir", default=None, help="Where generated CSVs are kept (default: temp dir)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Seconds before a configuration is abandoned (default: no limit)")
+    parser.add_argument("--output", default="training_results.json")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        for rows in args.rows:
+            data = os.path.join(data_dir, f"synthetic_{rows}_{args.fraud_rate}.csv")
+            if not os.path.exists(data):
+                write_csv(data, rows, args.fraud_rate)
+
+            for mode in args.modes:
+                # External memory always trains with hist
+                tree_methods = ["hist"] if mode == "external" else args.tree_methods
+                for tree_method in tree_methods:
+                    for nthread in args.nthreads:
+                        config = {
+                            "rows": rows,
+                            "fraud_rate": args.fraud_rate,
+                            "mode": mode,
+                            "tree_method": tree_method,
+                            "nthread": nthread,
+                            "n_estimators": args.n_estimators,
+                            "data": data,
+                        }
+                        try:
+                            result = run_isolated(_run_one, config, args.timeout)
+                        except RunFailed as exc:
+                            results.append({**config, "error": str(exc)})
+                            print(f"{rows:>10,} {mode:>8} {tree_method:>6} threads={nthread:<3} FAILED: {exc}")
+                            continue
+                        results.append(result)
+                        print(f"{rows:>10,} {mode:>8} {tree_method:>6} threads={nthread:<3} "
+                              f"{result['wall_seconds']:8.2f}s {result['peak_rss_mb']:8.0f} MB "
+                              f"{result['model_bytes'] / 1024:8.0f} KB  AUC={result['auc']:.4f}")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "machine": {"platform": platform.platform(), "cpus": os.cpu_count()},
+            "results": [{k: v for k, v in r.items() if k != "data"} for r in results],
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
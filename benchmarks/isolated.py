@@ -0,0 +1,44 @@
+import multiprocessing
+import queue
+import time
+
+# Runs one benchmark configuration in a fresh (spawned) process, so peak
+# RSS and library state are per run. Shared by bench_training and
+# bench_ingest.
+
+POLL_SECONDS = 1.0
+
+
+class RunFailed(RuntimeError):
+    """The child exited without a result (exception, OOM kill) or ran out of time."""
+
+
+def run_isolated(target, config, timeout=None):
+    """Call ``target(config, queue)`` in a new process and return what it puts on the queue.
+
+    Raises :class:`RunFailed` if the process dies before reporting, or is
+    still running after ``timeout`` seconds (it is then terminated).
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=target, args=(config, results))
+    proc.start()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                return results.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                pass
+            if not proc.is_alive():
+                # The result may have been queued just before the exit
+                try:
+                    return results.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    raise RunFailed(f"process exited with code {proc.exitcode} before reporting") from None
+            if deadline is not None and time.monotonic() > deadline:
+                raise RunFailed(f"no result after {timeout:g}s")
+    finally:
+        if proc.is_alive():
+            proc.terminate()
+        proc.join()
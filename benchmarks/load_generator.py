@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from schema import FEATURE_COLUMNS
+
+# Usage (with `python serve.py` running):
+#   python -m benchmarks.load_generator --concurrency 64 --duration 10 [--batch 1]
+#
+# Each client keeps one keep-alive connection and sends requests back to
+# back; latencies are measured on the client side.
+
+
+def make_bodies(n, batch, seed=0):
+    rng = np.random.default_rng(seed)
+    bodies = []
+    for _ in range(n):
+        rows = rng.standard_normal((batch, len(FEATURE_COLUMNS)))
+        txns = [dict(zip(FEATURE_COLUMNS, map(float, row))) for row in rows]
+        payload = txns[0] if batch == 1 else {"transactions": txns}
+        bodies.append(json.dumps(payload).encode())
+    return bodies
+
+
+async def client(host, port, bodies, stop_at, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    try:
+        while time.perf_counter() < stop_at:
+            body = bodies[i % len(bodies)]
+            i += 1
+            start = time.perf_counter()
+            writer.write(
+                f"POST /score HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+
+            length = 0
+            status = await reader.readline()
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            if b" 200 " not in status:
+                raise RuntimeError(f"server answered {status.decode().strip()}")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def fetch_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /stats HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+async def run(args):
+    bodies = make_bodies(256, args.batch)
+    latencies = []
+    start = time.perf_counter()
+    stop_at = start + args.duration
+    await asyncio.gather(*(client(args.host, args.port, bodies, stop_at, latencies)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    print(f"requests: {len(ms):,} in {elapsed:.1f}s  concurrency: {args.concurrency}  rows/request: {args.batch}")
+    print(f"throughput: {len(ms) / elapsed:,.0f} req/s, {len(ms) * args.batch / elapsed:,.0f} rows/s")
+    print(f"client latency p50: {np.percentile(ms, 50):.2f} ms  p99: {np.percentile(ms, 99):.2f} ms")
+    print(f"server stats: {await fetch_stats(args.host, args.port)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for serve.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--batch", type=int, default=1, help="Transactions per request")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
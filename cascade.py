@@ -0,0 +1,104 @@
+import json
+import os
+
+import numpy as np
+
+DEFAULT_STAGE1_FEATURES = 6
+DEFAULT_MAX_RECALL_LOSS = 0.0
+
+
+def cascade_path(model_path):
+    """First-stage model file that sits next to the main model."""
+    return os.path.splitext(model_path)[0] + ".cascade.json"
+
+
+class Cascade:
+    """Cheap first stage in front of the full booster.
+
+    A logistic regression over a handful of features scores every row;
+    only rows at or above ``threshold`` are sent to the full model. The
+    threshold is chosen on a validation slice so that (almost) every fraud
+    the full model catches still reaches it.
+    """
+
+    def __init__(self, features, coef, intercept, threshold, stats=None):
+        self.features = list(features)
+        self.coef = np.asarray(coef, dtype=np.float32)
+        self.intercept = np.float32(intercept)
+        self.threshold = float(threshold)
+        self.stats = stats or {}
+
+    @classmethod
+    def fit(cls, X_train, y_train, X_val, y_val, full_val_pred,
+            n_features=DEFAULT_STAGE1_FEATURES, max_recall_loss=DEFAULT_MAX_RECALL_LOSS):
+        """Fit the first stage and pick its pass-through threshold.
+
+        ``full_val_pred`` are the full model's 0/1 predictions on
+        ``X_val``. The threshold is the highest one that loses at most
+        ``max_recall_loss`` of the frauds the full model detects there, so
+        measure the result on other rows with :meth:`evaluate`.
+        """
+        from sklearn.linear_model import LogisticRegression
+
+        # Features most correlated with the label, standardized for the fit
+        y = np.asarray(y_train)
+        corr = X_train.corrwith(y_train.astype(np.float64)).abs().fillna(0)
+        features = list(corr.sort_values(ascending=False).index[:n_features])
+        Xf = X_train[features].to_numpy(dtype=np.float64)
+        mean, std = Xf.mean(axis=0), Xf.std(axis=0)
+        std[std == 0] = 1.0
+        lr = LogisticRegression(class_weight="balanced", max_iter=1000)
+        lr.fit((Xf - mean) / std, y)
+
+        # Fold the scaling into the coefficients so scoring is one dot product
+        coef = lr.coef_[0] / std
+        intercept = lr.intercept_[0] - np.sum(lr.coef_[0] * mean / std)
+        stage = cls(features, coef, intercept, 0.0)
+
+        val_scores = stage.stage1_proba(X_val[features].to_numpy(dtype=np.float32))
+        caught = (np.asarray(full_val_pred) == 1) & (np.asarray(y_val) == 1)
+        caught_scores = np.sort(val_scores[caught])
+        if len(caught_scores):
+            allowed_misses = int(np.floor(max_recall_loss * len(caught_scores)))
+            stage.threshold = float(caught_scores[allowed_misses])
+
+        return stage
+
+    def evaluate(self, X, y, full_pred):
+        """Short-circuit fraction and recall loss on rows the threshold was not tuned on.
+
+        ``full_pred`` are the full model's 0/1 predictions on ``X``.
+        """
+        scores = self.stage1_proba(X[self.features].to_numpy(dtype=np.float32))
+        caught = (np.asarray(full_pred) == 1) & (np.asarray(y) == 1)
+        passed = scores >= self.threshold
+        kept = caught & passed
+        frauds = max(int((np.asarray(y) == 1).sum()), 1)
+        return {
+            "evaluation_rows": int(len(scores)),
+            "short_circuit_fraction": float(1.0 - passed.mean()),
+            "full_model_recall": float(caught.sum() / frauds),
+            "cascade_recall": float(kept.sum() / frauds),
+            "recall_loss": float((caught.sum() - kept.sum()) / max(int(caught.sum()), 1)),
+        }
+
+    def stage1_proba(self, X):
+        """First-stage probabilities for rows holding just ``self.features``."""
+        margin = X @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-margin))
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({
+                "features": self.features,
+                "coef": [float(c) for c in self.coef],
+                "intercept": float(self.intercept),
+                "threshold": self.threshold,
+                "stats": self.stats,
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["features"], data["coef"], data["intercept"], data["threshold"], data.get("stats"))
@@ -0,0 +1,113 @@
+import numpy as np
+
+# Aggregates for the amount charts, computed from an AmountIndex so their
+# size depends on the number of bins / the outlier cap, never on row count.
+
+DEFAULT_BINS = 50
+DEFAULT_OUTLIER_CAP = 500
+
+
+def _prefix(index, type_name):
+    return index.fraud_prefix if type_name == "Fraudulent" else index.legit_prefix
+
+
+def amount_histogram(index, low, high, types, nbins=DEFAULT_BINS):
+    """Per-class counts over ``nbins`` equal-width bins between ``low`` and ``high``.
+
+    Bin edges are located in the sorted amounts by binary search and counted
+    with the prefix arrays, so this is O(nbins log n).
+    """
+    lo, hi = index.bounds(low, high)
+    if hi > lo:
+        # Span the data actually in range, like plotly's auto-binning would
+        low = float(index.sorted_amounts[lo])
+        high = float(index.sorted_amounts[hi - 1])
+    if high <= low:
+        high = low + 1.0
+    edges = np.linspace(low, high, nbins + 1)
+
+    scalar = index.sorted_amounts.dtype.type
+    cuts = np.searchsorted(index.sorted_amounts, edges.astype(scalar), side="left")
+    # The last bin is closed on the right
+    cuts[-1] = np.searchsorted(index.sorted_amounts, scalar(high), side="right")
+    cuts = np.clip(cuts, lo, hi)
+
+    counts = {}
+    for type_name in types:
+        prefix = _prefix(index, type_name)
+        counts[type_name] = np.diff(prefix[cuts])
+    return {"edges": edges, "counts": counts}
+
+
+def _positions_at_ranks(prefix, base, ranks):
+    # Sorted positions of the rows with the given 0-based class ranks, where
+    # ``base`` is the number of class rows before the amount range
+    return np.searchsorted(prefix, base + np.asarray(ranks) + 1, side="left") - 1
+
+
+def _value_at_rank(index, prefix, base, rank):
+    return float(index.sorted_amounts[_positions_at_ranks(prefix, base, rank)])
+
+
+def _quantile(index, prefix, base, count, q):
+    # Linear interpolation between order statistics, like numpy's default
+    pos = q * (count - 1)
+    below = int(np.floor(pos))
+    above = min(below + 1, count - 1)
+    low_value = _value_at_rank(index, prefix, base, below)
+    high_value = _value_at_rank(index, prefix, base, above)
+    return low_value + (high_value - low_value) * (pos - below)
+
+
+def amount_box_stats(index, low, high, types, outlier_cap=DEFAULT_OUTLIER_CAP):
+    """Quartiles, 1.5 IQR whiskers and a capped outlier sample per class.
+
+    Every statistic is an order statistic of one class inside the amount
+    range; each is found with binary searches over the sorted amounts and
+    the per-class prefix counts instead of touching the rows.
+    """
+    lo, hi = index.bounds(low, high)
+    scalar = index.sorted_amounts.dtype.type
+    stats = {}
+    for type_name in types:
+        prefix = _prefix(index, type_name)
+        base = int(prefix[lo])
+        count = int(prefix[hi]) - base
+        if count == 0:
+            continue
+
+        q1 = _quantile(index, prefix, base, count, 0.25)
+        median = _quantile(index, prefix, base, count, 0.5)
+        q3 = _quantile(index, prefix, base, count, 0.75)
+        iqr = q3 - q1
+
+        # Class ranks of the first value >= q1 - 1.5 IQR and the last
+        # value <= q3 + 1.5 IQR
+        fence_lo = np.searchsorted(index.sorted_amounts, scalar(q1 - 1.5 * iqr), side="left")
+        fence_hi = np.searchsorted(index.sorted_amounts, scalar(q3 + 1.5 * iqr), side="right")
+        first_inside = int(prefix[max(fence_lo, lo)]) - base
+        last_inside = int(prefix[min(fence_hi, hi)]) - base - 1
+        lowerfence = _value_at_rank(index, prefix, base, first_inside)
+        upperfence = _value_at_rank(index, prefix, base, last_inside)
+
+        # Outliers are the class ranks outside [first_inside, last_inside];
+        # sample them evenly so the payload is bounded by outlier_cap
+        n_below = first_inside
+        n_outliers = n_below + (count - last_inside - 1)
+        picks = np.arange(n_outliers)
+        if n_outliers > outlier_cap:
+            picks = np.linspace(0, n_outliers - 1, outlier_cap).astype(np.int64)
+        ranks = np.where(picks < n_below, picks, picks - n_below + last_inside + 1)
+        outliers = index.sorted_amounts[_positions_at_ranks(prefix, base, ranks)].astype(np.float64)
+
+        stats[type_name] = {
+            "count": count,
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "lowerfence": lowerfence,
+            "upperfence": upperfence,
+            "outliers": outliers,
+            "outlier_count": n_outliers,
+        }
+    return stats
@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+# A tree ensemble "compiled" to flat NumPy arrays. Every tree's nodes are
+# packed into shared arrays and all rows walk all trees at once, one depth
+# level per step, so a prediction is a handful of vectorized gathers with no
+# DMatrix construction or per-call XGBoost dispatch.
+#
+# That only pays off for small batches: the walk costs rows x trees x depth
+# gathers, while XGBoost's per-call overhead is fixed, so past a few dozen
+# rows the booster is faster. SmallBatchModel picks per call.
+
+COMPILED_MAX_ROWS = 32
+
+
+class CompiledForest:
+    def __init__(self, feature, threshold, left, right, default_left, value, roots,
+                 max_depth, base_margin, feature_names):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.base_margin = np.float32(base_margin)
+        self.feature_names_in_ = list(feature_names)
+
+    @classmethod
+    def from_booster(cls, booster):
+        """Compile a binary:logistic gbtree booster."""
+        model = json.loads(booster.save_raw("json"))
+        learner = model["learner"]
+        if learner["objective"]["name"] != "binary:logistic":
+            raise ValueError(f"unsupported objective {learner['objective']['name']}")
+        if learner["gradient_booster"]["name"] != "gbtree":
+            raise ValueError(f"unsupported booster {learner['gradient_booster']['name']}")
+
+        trees = learner["gradient_booster"]["model"]["trees"]
+        feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for tree in trees:
+            if tree.get("categories_nodes"):
+                raise ValueError("categorical splits are not supported")
+            lc = np.asarray(tree["left_children"], dtype=np.int32)
+            rc = np.asarray(tree["right_children"], dtype=np.int32)
+            is_leaf = lc == -1
+            # Leaves point at themselves, so extra steps past a leaf are no-ops
+            own = np.arange(len(lc), dtype=np.int32) + offset
+            left.append(np.where(is_leaf, own, lc + offset))
+            right.append(np.where(is_leaf, own, rc + offset))
+            feature.append(np.where(is_leaf, 0, tree["split_indices"]).astype(np.int32))
+            conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+            threshold.append(np.where(is_leaf, np.float32(np.inf), conditions))
+            value.append(np.where(is_leaf, conditions, np.float32(0)))
+            default_left.append(np.asarray(tree["default_left"], dtype=bool))
+            roots.append(offset)
+            max_depth = max(max_depth, _depth(lc, rc))
+            offset += len(lc)
+
+        base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+        base_margin = np.log(base_score / (1.0 - base_score))
+        return cls(
+            np.concatenate(feature), np.concatenate(threshold), np.concatenate(left),
+            np.concatenate(right), np.concatenate(default_left), np.concatenate(value),
+            np.asarray(roots, dtype=np.int32), max_depth, base_margin,
+            [str(name) for name in booster.feature_names or []],
+        )
+
+    def predict_margin(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = (x < self.threshold[node]) | (np.isnan(x) & self.default_left[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        # Add tree outputs one at a time in float32, the order XGBoost uses
+        leaves = self.value[node]
+        margin = np.full(len(X), self.base_margin, dtype=np.float32)
+        for t in range(leaves.shape[1]):
+            margin += leaves[:, t]
+        return margin
+
+    def predict_proba(self, X):
+        margin = self.predict_margin(X)
+        # XGBoost's float32 sigmoid: 1 / (expf(min(-x, 88.7)) + 1 + 1e-16).
+        # The clamp keeps very negative margins at ~3e-39 rather than 0;
+        # exp in float64 rounded to float32 stands in for a correctly
+        # rounded expf (NumPy's float32 exp can be off by an ulp)
+        x = np.minimum(-margin, np.float32(88.7))
+        e = np.exp(x.astype(np.float64)).astype(np.float32)
+        positive = np.float32(1) / (e + np.float32(1) + np.float32(1e-16))
+        return np.column_stack([1 - positive, positive])
+
+    def save(self, path):
+        np.savez(
+            path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            default_left=self.default_left, value=self.value, roots=self.roots,
+            max_depth=self.max_depth, base_margin=self.base_margin,
+            feature_names=np.asarray(self.feature_names_in_),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                data["feature"], data["threshold"], data["left"], data["right"],
+                data["default_left"], data["value"], data["roots"], data["max_depth"],
+                data["base_margin"], [str(name) for name in data["feature_names"]],
+            )
+
+
+class SmallBatchModel:
+    """Score batches of at most ``max_rows`` rows with the compiled forest, larger ones with the booster."""
+
+    def __init__(self, model, forest, max_rows=COMPILED_MAX_ROWS):
+        self.model = model
+        self.forest = forest
+        self.max_rows = max_rows
+        self.feature_names_in_ = forest.feature_names_in_
+
+    def get_booster(self):
+        return self.model.get_booster()
+
+    def predict_proba(self, X):
+        if len(X) <= self.max_rows:
+            return self.forest.predict_proba(X)
+        return self.model.predict_proba(X)
+
+
+def _depth(left, right):
+    depth = np.zeros(len(left), dtype=np.int32)
+    for node in range(len(left)):
+        if left[node] != -1:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+def compiled_path(model_path):
+    return os.path.splitext(model_path)[0] + ".forest.npz"
+
+
+def ulp_distance(a, b):
+    """Elementwise distance in float32 units in the last place (same-sign values)."""
+    a = np.ascontiguousarray(a, dtype=np.float32).view(np.int32).astype(np.int64)
+    b = np.ascontiguousarray(b, dtype=np.float32).view(np.int32).astype(np.int64)
+    return np.abs(a - b)
+
+
+def check_equivalence(booster, forest, X):
+    """Max absolute difference between booster and compiled margins and probabilities.
+
+    ``proba_ulps`` is the largest probability difference in float32 ulps:
+    margins are summed in XGBoost's order and match exactly, but the
+    sigmoid goes through the platform's ``expf``, whose last-bit rounding
+    may differ between libm builds.
+    """
+    import xgboost as xgb
+
+    X = np.asarray(X, dtype=np.float32)
+    dmatrix = xgb.DMatrix(X, feature_names=forest.feature_names_in_ or None)
+    margin = booster.predict(dmatrix, output_margin=True)
+    proba = booster.predict(dmatrix)
+    compiled = forest.predict_proba(X)[:, 1]
+    return {
+        "margin": float(np.abs(margin - forest.predict_margin(X)).max()),
+        "proba": float(np.abs(proba - compiled).max()),
+        "proba_ulps": int(ulp_distance(proba, compiled).max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a trained booster as a compiled NumPy forest")
+    parser.add_argument("model", help="Native booster (.ubj/.json) or pickled model")
+    parser.add_argument("--out", default=None, help="Output .npz (default: next to the model)")
+    args = parser.parse_args()
+
+    from scoring import load_model
+
+    booster = load_model(args.model).get_booster()
+    forest = CompiledForest.from_booster(booster)
+    out = args.out or compiled_path(args.model)
+    forest.save(out)
+    print(f"Compiled {len(forest.roots)} trees (max depth {forest.max_depth}) to {out}")
+
+
+if __name__ == "__main__":
+    main()
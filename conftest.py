@@ -0,0 +1 @@
+# Lets pytest import the app modules, which live at the repository root.
@@ -0,0 +1,173 @@
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from amount_index import amount_index
+from frame_cache import per_frame
+
+DEFAULT_BLOCK_ROWS = 16_384
+FILTER_CACHE_SIZE = 64
+CONSTANT_TOLERANCE = 1e-9
+
+
+class PairwiseMoments:
+    """Sums behind pairwise-complete correlations, as ``DataFrame.corr`` computes them.
+
+    Each column pair only counts the rows where both values are present:
+    ``n[i, j]`` such rows, ``s[i, j]`` / ``q[i, j]`` the sum and sum of
+    squares of column ``i`` over them and ``p[i, j]`` the sum of products.
+    Sums over disjoint row sets add, so blocks and the partial rows at the
+    edges of a range combine with :meth:`add` in any order.
+    """
+
+    def __init__(self, n_features):
+        shape = (n_features, n_features)
+        self.n, self.s, self.q, self.p = (np.zeros(shape) for _ in range(4))
+
+    @classmethod
+    def from_rows(cls, X):
+        """Moments of the rows of ``X`` (NaN marks a missing value)."""
+        moments = cls(X.shape[1])
+        present = ~np.isnan(X)
+        if present.all():
+            # No missing values: every pair sees every row
+            column_sums = X.sum(axis=0)
+            moments.n[:] = len(X)
+            moments.s[:] = column_sums[:, None]
+            moments.q[:] = (X * X).sum(axis=0)[:, None]
+            moments.p = X.T @ X
+            return moments
+        M = present.astype(np.float64)
+        X = np.where(present, X, 0.0)
+        moments.n = M.T @ M
+        moments.s = X.T @ M
+        moments.q = (X * X).T @ M
+        moments.p = X.T @ X
+        return moments
+
+    def add(self, other):
+        self.n = self.n + other.n
+        self.s = self.s + other.s
+        self.q = self.q + other.q
+        self.p = self.p + other.p
+        return self
+
+    def correlation(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = self.p - self.s * self.s.T / self.n
+            # Variance of column i over the rows it shares with column j
+            var = self.q - self.s * self.s / self.n
+            corr = cov / np.sqrt(var * var.T)
+        # A constant column has no correlation (NaN, as in pandas); rounding
+        # leaves its variance a tiny fraction of the sum of squares, not 0
+        constant = var <= CONSTANT_TOLERANCE * self.q
+        corr[(self.n < 2) | constant | constant.T] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+
+class CorrelationIndex:
+    """Block-wise co-moments of a frame, laid out along the Amount index.
+
+    For each class, rows are taken in Amount order and cut into blocks of
+    ``block_rows``. Prefix sums of the per-block :class:`PairwiseMoments`
+    give the moments of any run of whole blocks in O(d^2); only the partial
+    blocks at the edges of an amount range are read from the frame. Missing
+    values are left out pair by pair, as ``DataFrame.corr`` does. Results
+    are cached per filter state.
+    """
+
+    def __init__(self, df, columns, block_rows=DEFAULT_BLOCK_ROWS):
+        # Weak, so the per-frame cache entry does not keep the frame alive
+        self._frame = weakref.ref(df)
+        self.columns = list(columns)
+        self.block_rows = block_rows
+        self.index = amount_index(df)
+        self._cache = OrderedDict()
+
+        n_features = len(self.columns)
+        # Moments are summed around the column means so the sums stay small
+        self.center = self._column_means(df)
+        self.class_orders = {
+            "Fraudulent": self.index.order[self.index.sorted_is_fraud],
+            "Legitimate": self.index.order[self.index.sorted_is_legit],
+        }
+
+        # Per class: prefix over blocks of the n, s, q and p moment matrices
+        self.prefix = {}
+        for type_name, order in self.class_orders.items():
+            n_blocks = len(order) // block_rows
+            prefix = np.zeros((4, n_blocks + 1, n_features, n_features))
+            for b in range(n_blocks):
+                moments = self._moments(order[b * block_rows:(b + 1) * block_rows])
+                for k, total in enumerate((moments.n, moments.s, moments.q, moments.p)):
+                    prefix[k, b + 1] = prefix[k, b] + total
+            self.prefix[type_name] = prefix
+
+    def _column_means(self, df):
+        # One column and one block at a time, skipping NaNs; never copies
+        # more than a block of the frame
+        n_rows = len(df)
+        means = np.zeros(len(self.columns))
+        for j, col in enumerate(self.columns):
+            values = df[col].to_numpy()
+            total, count = 0.0, 0
+            for start in range(0, n_rows, self.block_rows):
+                block = values[start:start + self.block_rows]
+                present = ~np.isnan(block)
+                total += float(block.sum(where=present, dtype=np.float64))
+                count += int(present.sum())
+            means[j] = total / count if count else 0.0
+        return means
+
+    def _moments(self, positions):
+        df = self._frame()
+        X = np.empty((len(positions), len(self.columns)))
+        for j, col in enumerate(self.columns):
+            X[:, j] = df[col].to_numpy()[positions]
+        return PairwiseMoments.from_rows(X - self.center)
+
+    def _block_range(self, type_name, first, last):
+        prefix = self.prefix[type_name]
+        moments = PairwiseMoments(len(self.columns))
+        moments.n, moments.s, moments.q, moments.p = prefix[:, last] - prefix[:, first]
+        return moments
+
+    def _class_moments(self, type_name, lo, hi):
+        prefix = self.index.fraud_prefix if type_name == "Fraudulent" else self.index.legit_prefix
+        order = self.class_orders[type_name]
+        start, stop = int(prefix[lo]), int(prefix[hi])
+
+        first_block = -(-start // self.block_rows)
+        last_block = min(stop // self.block_rows, self.prefix[type_name].shape[1] - 1)
+        if first_block >= last_block:
+            return self._moments(order[start:stop])
+
+        moments = self._block_range(type_name, first_block, last_block)
+        moments.add(self._moments(order[start:first_block * self.block_rows]))
+        return moments.add(self._moments(order[last_block * self.block_rows:stop]))
+
+    def correlation(self, low, high, types):
+        """Correlation matrix (as a DataFrame) for one filter state."""
+        lo, hi = self.index.bounds(low, high)
+        key = (lo, hi, tuple(sorted(types)))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        moments = PairwiseMoments(len(self.columns))
+        for type_name in types:
+            moments.add(self._class_moments(type_name, lo, hi))
+        corr = pd.DataFrame(moments.correlation(), index=self.columns, columns=self.columns)
+
+        self._cache[key] = corr
+        if len(self._cache) > FILTER_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return corr
+
+
+def correlation_index(df):
+    """Return the (cached) :class:`CorrelationIndex` over all numeric columns of ``df``."""
+    columns = df.select_dtypes(include="number").columns
+    return per_frame(df, "correlation_index", lambda frame: CorrelationIndex(frame, columns))
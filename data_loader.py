@@ -0,0 +1,144 @@
+import hashlib
+import os
+import time
+
+import pandas as pd
+
+from dataset_store import dataset_path, forget, open_dataset, publish
+from ingest import read_csv
+from preflight import TRAINING_COLUMNS, check_csv
+from schema import compact_frame
+
+DEFAULT_DATA_PATH = "data/creditcard.csv"
+SIDECAR_DIR = ".cache"
+
+# --- In-process cache ---
+# Streamlit re-runs page scripts on every widget change but keeps imported
+# modules alive, so frames stored here survive reruns for the whole process.
+# Entries are keyed on the absolute path and validated against (mtime, size).
+_frame_cache = {}
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _store_key(path, fingerprint):
+    source = f"{path}|{fingerprint[0]}|{fingerprint[1]}".encode()
+    return "file-" + hashlib.sha256(source).hexdigest()[:32]
+
+
+def mapped_path(path):
+    """Location of the shared memory-mapped copy of the current version of ``path``."""
+    key = os.path.abspath(path)
+    return dataset_path(_store_key(key, _fingerprint(key)))
+
+
+def sidecar_path(path):
+    """Location of the Parquet copy kept next to a CSV file."""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, SIDECAR_DIR, os.path.splitext(name)[0] + ".parquet")
+
+
+def _read_sidecar(path, fingerprint):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+
+    sidecar = sidecar_path(path)
+    if not os.path.exists(sidecar):
+        return None
+
+    # The sidecar records the fingerprint of the CSV it was built from;
+    # any change to the source file makes it stale.
+    metadata = pq.read_schema(sidecar).metadata or {}
+    stored = metadata.get(b"source_fingerprint", b"").decode()
+    if stored != f"{fingerprint[0]}:{fingerprint[1]}":
+        return None
+
+    return pd.read_parquet(sidecar)
+
+
+def _write_sidecar(path, fingerprint, df):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return
+
+    sidecar = sidecar_path(path)
+    try:
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b"source_fingerprint"] = f"{fingerprint[0]}:{fingerprint[1]}".encode()
+        table = table.replace_schema_metadata(metadata)
+
+        # Write to a temp file first so a concurrent reader never sees a
+        # half-written sidecar.
+        tmp_path = sidecar + ".tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, sidecar)
+    except OSError:
+        # A read-only data directory should not break loading.
+        pass
+
+
+def load_dataset(path=DEFAULT_DATA_PATH):
+    """Load a transactions CSV, reusing the in-process cache or Parquet sidecar.
+
+    Frames read from disk are published to :mod:`dataset_store`, so the
+    returned frame is read-only and memory-mapped, and a second server
+    process maps the same file instead of parsing again. Returns
+    ``(df, stats)`` where ``stats`` reports which tier served the request
+    (``memory``, ``mapped``, ``parquet`` or ``csv``) and how long it took.
+    A CSV that fails :func:`preflight.check_csv` raises ``ValueError``
+    before it is parsed.
+    """
+    start = time.perf_counter()
+    key = os.path.abspath(path)
+    fingerprint = _fingerprint(key)
+
+    cached = _frame_cache.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        df, source = cached[1], "memory"
+    else:
+        store_key = _store_key(key, fingerprint)
+        df = open_dataset(store_key)
+        if df is not None:
+            source = "mapped"
+        else:
+            df = _read_sidecar(key, fingerprint)
+            if df is not None:
+                source = "parquet"
+            else:
+                # Fail in milliseconds with a precise error (ValueError)
+                # rather than after parsing a file that is not usable
+                check_csv(key, required=TRAINING_COLUMNS)
+                df = compact_frame(read_csv(key))
+                source = "csv"
+                _write_sidecar(key, fingerprint, df)
+            df = publish(store_key, df)
+        _frame_cache[key] = (fingerprint, df)
+
+    stats = {
+        "path": path,
+        "source": source,
+        "rows": len(df),
+        "seconds": time.perf_counter() - start,
+    }
+    return df, stats
+
+
+def clear_cache(path=None):
+    """Drop cached frames (all of them, or just the one for ``path``).
+
+    The memory-mapped files stay on disk, so the next load maps them again.
+    """
+    keys = list(_frame_cache) if path is None else [os.path.abspath(path)]
+    for key in keys:
+        cached = _frame_cache.pop(key, None)
+        if cached is not None:
+            forget(_store_key(key, cached[0]))
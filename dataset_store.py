@@ -0,0 +1,192 @@
+import collections
+import os
+import threading
+import weakref
+
+import pandas as pd
+
+STORE_DIR = os.path.join(".cache", "datasets")
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+DEFAULT_RETAINED = 4
+
+# --- Shared dataset registry ---
+# One read-only frame per distinct dataset for the whole server process.
+# Every session that opens the same key gets the same frame object, whose
+# columns are views of a memory-mapped Arrow file, so extra users add no
+# copies (and processes mapping the same file share its page cache).
+# Frames are held weakly: a dataset stays registered while any session
+# holds it, plus the last few used (so reruns don't re-map), after which
+# its mapping closes and the file can be evicted from disk.
+_datasets = weakref.WeakValueDictionary()
+_recent = collections.OrderedDict()
+_lock = threading.Lock()
+
+
+def dataset_path(key, directory=STORE_DIR):
+    return os.path.join(directory, key + ".arrow")
+
+
+def _to_table(df):
+    import pyarrow as pa
+
+    # Columns are converted from their NumPy buffers directly so NaN stays
+    # NaN (no validity bitmap) and every column maps back without a copy
+    arrays, names = [], []
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            array = pa.DictionaryArray.from_arrays(
+                pa.array(series.cat.codes.to_numpy(), mask=series.cat.codes.to_numpy() < 0),
+                pa.array(series.cat.categories.astype(str).to_numpy()),
+            )
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            array = pa.array(series.to_numpy())
+        else:
+            array = pa.array(series, from_pandas=True)
+        arrays.append(array)
+        names.append(str(col))
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def _write(path, df):
+    import pyarrow as pa
+
+    table = _to_table(df)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _column(chunked):
+    import pyarrow as pa
+
+    # combine_chunks() copies even a single chunk; the file is written as
+    # one record batch, so take that chunk as-is
+    array = chunked.chunk(0) if chunked.num_chunks == 1 else chunked.combine_chunks()
+    if pa.types.is_dictionary(array.type):
+        codes = array.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+        categories = array.dictionary.to_pylist()
+        return pd.Categorical.from_codes(codes, categories=categories)
+    if array.null_count == 0 and (pa.types.is_integer(array.type) or pa.types.is_floating(array.type)):
+        return array.to_numpy(zero_copy_only=True)
+    return array.to_pandas()
+
+
+def _map(path):
+    import pyarrow as pa
+
+    # The table's buffers point into the mapping, which stays open for as
+    # long as the frame references them
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    columns = {name: _column(table.column(name)) for name in table.column_names}
+    return pd.DataFrame(columns, copy=False)
+
+
+def _register(key, df):
+    # Called with the lock held; returns the frame registered under ``key``
+    shared = _datasets.get(key)
+    if shared is None:
+        shared = _datasets[key] = df
+    _recent[key] = shared
+    _recent.move_to_end(key)
+    while len(_recent) > DEFAULT_RETAINED:
+        _recent.popitem(last=False)
+    return shared
+
+
+def open_dataset(key, directory=STORE_DIR):
+    """The shared frame for ``key``, mapping it from disk if needed; None if unknown."""
+    with _lock:
+        df = _datasets.get(key)
+        if df is not None:
+            return _register(key, df)
+
+    path = dataset_path(key, directory)
+    try:
+        # Mapped outside the lock; a concurrent open of the same key maps
+        # it too, and _register keeps whichever frame was registered first
+        df = _map(path)
+        os.utime(path)
+    except (ImportError, OSError):
+        return None
+    with _lock:
+        return _register(key, df)
+
+
+def forget(key):
+    """Drop ``key`` from the registry; frames already handed out stay valid."""
+    with _lock:
+        _datasets.pop(key, None)
+        _recent.pop(key, None)
+
+
+def publish(key, df, directory=STORE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """Store ``df`` under ``key`` (once) and return the shared, memory-mapped frame.
+
+    The caller should drop its own copy and keep the returned frame. If
+    pyarrow is missing or the store is not writable, ``df`` itself is
+    registered and shared in memory instead.
+    """
+    with _lock:
+        shared = _datasets.get(key)
+        if shared is not None:
+            return _register(key, shared)
+
+    # The write can take seconds for a large frame, so it runs without the
+    # lock; two sessions publishing the same key write identical files and
+    # the rename makes either result complete
+    path = dataset_path(key, directory)
+    try:
+        if not os.path.exists(path):
+            _write(path, df)
+            _evict(max_bytes, directory, keep=path)
+        shared = _map(path)
+    except (ImportError, OSError):
+        shared = df
+    with _lock:
+        return _register(key, shared)
+
+
+def _evict(max_bytes, directory, keep=None):
+    # Least recently opened first; datasets still registered are kept (a
+    # session holds them, and Windows refuses to delete a mapped file)
+    with _lock:
+        mapped = {os.path.abspath(dataset_path(key, directory)) for key in _datasets.keys()}
+    if keep is not None:
+        mapped.add(os.path.abspath(keep))
+    entries, total = [], 0
+    for name in os.listdir(directory):
+        path = os.path.abspath(os.path.join(directory, name))
+        if not name.endswith(".arrow"):
+            continue
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        total += stat.st_size
+        if path not in mapped:
+            entries.append((stat.st_mtime, stat.st_size, path))
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            # Mapped by another process, or already gone
+            continue
+        total -= size
+
+
+def store_stats():
+    """Distinct datasets currently held in this process and the bytes they reference."""
+    with _lock:
+        frames = list(_datasets.values())
+    return {
+        "datasets": len(frames),
+        "rows": sum(len(df) for df in frames),
+        "bytes": sum(int(df.memory_usage(index=True, deep=False).sum()) for df in frames),
+    }
+
@@ -0,0 +1,66 @@
+import collections
+
+import numpy as np
+import pandas as pd
+
+from frame_cache import per_frame
+from scoring import model_features
+
+DEFAULT_MAX_ROWS = 10_000
+BIAS_COLUMN = "bias"
+
+
+class RowExplainer:
+    """Per-row feature contributions from the booster, computed on demand.
+
+    Contributions come from XGBoost's ``pred_contribs`` output (exact
+    TreeSHAP values on the margin scale; they sum with ``bias`` to the
+    row's log-odds). Only rows that are asked for are explained, in one
+    batched call per request for the rows not already cached; results
+    are kept per row label in an LRU of ``max_rows`` entries.
+    """
+
+    def __init__(self, model, max_rows=DEFAULT_MAX_ROWS):
+        self.booster = model.get_booster()
+        self.features = model_features(model)
+        self.max_rows = max_rows
+        self._rows = collections.OrderedDict()
+        self.computed = 0
+
+    def explain(self, df, labels):
+        """Contributions for the rows of ``df`` with index ``labels``, one row each."""
+        import xgboost as xgb
+
+        labels = list(labels)
+        missing = [label for label in labels if label not in self._rows]
+        if missing:
+            X = df.loc[missing, self.features].to_numpy(dtype=np.float32)
+            contribs = self.booster.predict(xgb.DMatrix(X, feature_names=self.features), pred_contribs=True)
+            for label, row in zip(missing, contribs):
+                self._rows[label] = row
+            self.computed += len(missing)
+
+        for label in labels:
+            self._rows.move_to_end(label)
+        while len(self._rows) > self.max_rows:
+            self._rows.popitem(last=False)
+
+        values = np.array([self._rows[label] for label in labels]).reshape(len(labels), len(self.features) + 1)
+        return pd.DataFrame(values, index=labels, columns=self.features + [BIAS_COLUMN])
+
+
+def top_contributions(contribs, k=3):
+    """Strongest ``k`` features per row as ``"V14 +2.31"`` strings, largest magnitude first."""
+    values = contribs.drop(columns=BIAS_COLUMN)
+    top = np.argsort(-np.abs(values.to_numpy()), axis=1)[:, :k]
+    names = values.columns.to_numpy()
+    return pd.DataFrame(
+        [[f"{names[j]} {row[j]:+.2f}" for j in order] for row, order in zip(values.to_numpy(), top)],
+        index=contribs.index,
+        columns=[f"Top {i + 1}" for i in range(top.shape[1])],
+    )
+
+
+def row_explainer(df, model):
+    """Return the (cached) :class:`RowExplainer` for ``df`` and ``model``."""
+    return per_frame(df, f"explainer:{id(model)}", lambda _: RowExplainer(model))
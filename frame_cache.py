@@ -0,0 +1,19 @@
+import weakref
+
+# --- Per-frame cache ---
+# Derived structures (indexes, aggregates) keyed on id(df) and checked
+# through a weak reference, so they live exactly as long as their frame.
+_entries = {}
+
+
+def per_frame(df, name, build):
+    """Return ``build(df)``, computed once per live frame and ``name``."""
+    key = (id(df), name)
+    entry = _entries.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+
+    value = build(df)
+    _entries[key] = (weakref.ref(df), value)
+    weakref.finalize(df, _entries.pop, key, None)
+    return value
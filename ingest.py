@@ -0,0 +1,208 @@
+import os
+import time
+
+import pandas as pd
+
+from schema import CSV_DTYPES, compact_frame
+
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_MEMORY_BUDGET_MB = 1024
+CSV_ENGINES = ("pyarrow", "c")
+ARROW_BLOCK_BYTES = 8 * 1024 ** 2
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MB.
+
+    Uses psutil, else ``/proc/self/statm`` (Linux). Where neither exists it
+    is 0, so memory readouts show 0 MB rather than failing the ingest; the
+    peak from ``resource`` is never reported, as it does not go down.
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (0 if it cannot be measured)."""
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return 0.0
+    # Windows reports the peak working set
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss) / 1024 ** 2
+
+
+# --- CSV engines ---
+# "pyarrow" parses with Arrow's multithreaded reader, "c" with pandas' own
+# parser. Both read the known columns with CSV_DTYPES instead of inferring.
+
+
+def default_engine():
+    """``pyarrow`` when it is installed, else pandas' C parser."""
+    try:
+        import pyarrow.csv  # noqa: F401
+        return "pyarrow"
+    except ImportError:
+        return "c"
+
+
+def _arrow_options():
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    column_types = {col: pa.from_numpy_dtype(dtype) for col, dtype in CSV_DTYPES.items()}
+    return (pacsv.ReadOptions(block_size=ARROW_BLOCK_BYTES),
+            pacsv.ConvertOptions(column_types=column_types))
+
+
+def _arrow_frame(table):
+    # Columns are released from the table as they are converted, so the
+    # Arrow and pandas copies of the data are never both fully alive
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def read_csv(source, engine=None):
+    """Parse a whole CSV (path or file object) into a frame with ``engine``."""
+    engine = engine or default_engine()
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"unknown CSV engine {engine!r}, expected one of {', '.join(CSV_ENGINES)}")
+    if engine == "c":
+        return pd.read_csv(source, dtype=CSV_DTYPES)
+
+    import pyarrow.csv as pacsv
+    read_options, convert_options = _arrow_options()
+    table = pacsv.read_csv(source, read_options=read_options, convert_options=convert_options)
+    return _arrow_frame(table)
+
+
+def iter_csv(source, chunk_rows=DEFAULT_CHUNK_ROWS, engine=None):
+    """Yield frames of exactly ``chunk_rows`` rows (the last may be shorter).
+
+    Chunk boundaries are the same for every engine, so anything keyed on
+    the chunk number (e.g. the training holdout split) does not change.
+    """
+    engine = engine or default_engine()
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"unknown CSV engine {engine!r}, expected one of {', '.join(CSV_ENGINES)}")
+    if engine == "c":
+        yield from pd.read_csv(source, chunksize=chunk_rows, dtype=CSV_DTYPES)
+        return
+
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    read_options, convert_options = _arrow_options()
+    reader = pacsv.open_csv(source, read_options=read_options, convert_options=convert_options)
+    pending, pending_rows = [], 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_rows:
+            table = pa.Table.from_batches(pending)
+            yield _arrow_frame(table.slice(0, chunk_rows))
+            rest = table.slice(chunk_rows)
+            pending, pending_rows = rest.to_batches(), rest.num_rows
+    if pending_rows:
+        yield _arrow_frame(pa.Table.from_batches(pending))
+
+
+def retained_budget_bytes(memory_budget_mb):
+    """Bytes of compacted rows :func:`stream_csv` keeps within ``memory_budget_mb``."""
+    return memory_budget_mb * 1024 ** 2 / 2
+
+
+def stream_csv(source, chunk_rows=DEFAULT_CHUNK_ROWS, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+               transform=None, on_chunk=None, engine=None):
+    """Read a CSV in chunks while keeping memory bounded.
+
+    Each raw chunk is optionally passed through ``transform`` (e.g. model
+    scoring), compacted with ``schema.compact_frame`` and appended to the
+    result; the raw chunk is then released, so at most one raw chunk is
+    alive next to the compacted rows. Row and class counts always cover the
+    whole file. Once the retained rows would push the compacted result past
+    half of ``memory_budget_mb`` (the other half is headroom for the raw
+    chunk and the final concat), further rows are counted but not kept and
+    ``stats['truncated']`` is set.
+
+    ``on_chunk(stats, chunk)`` is called after every chunk with running
+    totals so callers can update progress displays.
+
+    Pass ``chunk_rows=None`` to read the file in a single pass. ``engine``
+    is one of ``CSV_ENGINES`` (default: :func:`default_engine`).
+
+    Returns ``(df, stats)``.
+    """
+    start = time.perf_counter()
+    retained_budget = retained_budget_bytes(memory_budget_mb)
+
+    stats = {
+        "rows": 0,
+        "retained_rows": 0,
+        "retained_bytes": 0,
+        "fraud": 0,
+        "legit": 0,
+        "has_class": False,
+        "columns": 0,
+        "chunks": 0,
+        "truncated": False,
+        "peak_rss_mb": current_rss_mb(),
+    }
+
+    if chunk_rows is None:
+        reader = [read_csv(source, engine)]
+    else:
+        reader = iter_csv(source, chunk_rows, engine)
+
+    parts = []
+    for chunk in reader:
+        if transform is not None:
+            chunk = transform(chunk)
+
+        stats["chunks"] += 1
+        stats["rows"] += len(chunk)
+        stats["columns"] = len(chunk.columns)
+        if "Class" in chunk.columns:
+            stats["has_class"] = True
+            stats["fraud"] += int((chunk["Class"] == 1).sum())
+            stats["legit"] += int((chunk["Class"] == 0).sum())
+
+        if not stats["truncated"]:
+            compact = compact_frame(chunk)
+            size = int(compact.memory_usage(index=True, deep=True).sum())
+            if stats["retained_bytes"] + size > retained_budget and parts:
+                stats["truncated"] = True
+            else:
+                parts.append(compact)
+                stats["retained_rows"] += len(compact)
+                stats["retained_bytes"] += size
+
+        stats["peak_rss_mb"] = max(stats["peak_rss_mb"], current_rss_mb())
+        if on_chunk is not None:
+            on_chunk(stats, chunk)
+        del chunk
+
+    if not parts:
+        df = pd.DataFrame()
+    elif len(parts) == 1:
+        df = parts[0]
+    else:
+        df = pd.concat(parts, ignore_index=True)
+    del parts
+
+    stats["peak_rss_mb"] = max(stats["peak_rss_mb"], current_rss_mb())
+    stats["seconds"] = time.perf_counter() - start
+    return df, stats
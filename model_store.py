@@ -0,0 +1,84 @@
+import datetime
+import json
+import os
+
+import numpy as np
+
+NATIVE_FORMATS = ("ubj", "json")
+
+
+def native_path(model_path, fmt="ubj"):
+    """Native booster file that sits next to a pickled model."""
+    return os.path.splitext(model_path)[0] + "." + fmt
+
+
+def metadata_path(model_path):
+    return os.path.splitext(model_path)[0] + ".meta.json"
+
+
+def save_native(model, model_path, metrics=None, params=None, fmt="ubj"):
+    """Write the booster in XGBoost's own format plus a small metadata file.
+
+    The booster file has no Python pickle in it, so it loads without
+    scikit-learn and across XGBoost versions that read the format.
+    Returns the path of the booster file.
+    """
+    import xgboost as xgb
+
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    path = native_path(model_path, fmt)
+    booster.save_model(path)
+
+    metadata = {
+        "format": f"xgboost-{fmt}",
+        "model_file": os.path.basename(path),
+        "features": [str(name) for name in booster.feature_names or []],
+        "xgboost_version": xgb.__version__,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "num_boosted_rounds": booster.num_boosted_rounds(),
+        "params": params or {},
+        "training": {k: float(v) if isinstance(v, (float, np.floating)) else v
+                     for k, v in (metrics or {}).items()},
+    }
+    with open(metadata_path(model_path), "w") as f:
+        json.dump(metadata, f, indent=2)
+    return path
+
+
+def read_metadata(model_path):
+    path = metadata_path(model_path)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+class BoosterModel:
+    """Minimal classifier facade over a raw ``xgboost.Booster``.
+
+    Exposes the ``predict_proba`` / ``feature_names_in_`` surface the
+    scoring code uses, predicting with ``inplace_predict`` so no DMatrix is
+    built per call.
+    """
+
+    def __init__(self, booster, metadata=None):
+        self.booster = booster
+        self.metadata = metadata or {}
+        names = self.metadata.get("features") or booster.feature_names or []
+        self.feature_names_in_ = list(names)
+
+    def get_booster(self):
+        return self.booster
+
+    def predict_proba(self, X):
+        positive = self.booster.inplace_predict(X, validate_features=False)
+        return np.column_stack([1.0 - positive, positive])
+
+
+def load_native(path):
+    """Load a native booster file (and its metadata) as a :class:`BoosterModel`."""
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(path)
+    return BoosterModel(booster, read_metadata(path))
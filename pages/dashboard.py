@@ -1,8 +1,25 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from amount_index import amount_index
+from chart_aggregates import amount_box_stats, amount_histogram
+from correlation import correlation_index
+from data_loader import DEFAULT_DATA_PATH, load_dataset
+from explanations import BIAS_COLUMN, row_explainer, top_contributions
+from frame_cache import per_frame
+from preflight import check_columns
+from schema import compact_frame, memory_report
+from score_curves import score_curves
+from row_pages import page_count, page_rows, row_pages
+from sampling import DEFAULT_LEGIT_CAP, stratified_sample
+from scoring import (DEFAULT_THRESHOLD, SCORE_COLUMN, expected_features, load_model, missing_features,
+                     model_available)
+
+TYPE_COLORS = {'Legitimate': '#00CC96', 'Fraudulent': '#EF553B'}
+
 # --- Page Config ---
 st.set_page_config(
     page_title="Fraud Analytics Dashboard",
@@ -337,8 +354,14 @@ if st.session_state.uploaded_data is not None:
 else:
     # Fallback to file system
     try:
-        df = pd.read_csv("data/creditcard.csv")
-        st.info("Loaded data from file system (data/creditcard.csv)")
+        df, load_stats = load_dataset(DEFAULT_DATA_PATH)
+        st.info(
+            f"Loaded data from file system ({DEFAULT_DATA_PATH}) "
+            f"via {load_stats['source']} in {load_stats['seconds'] * 1000:.1f} ms"
+        )
+    except ValueError as e:
+        st.error(f"{DEFAULT_DATA_PATH} is not a usable transactions file: {e}")
+        st.stop()
     except:
         st.error("No data found! Please upload a CSV file first.")
         st.markdown("<br>", unsafe_allow_html=True)
@@ -354,16 +377,30 @@ if df is None or df.empty:
     st.warning("Dataset is empty. Please check your data source.")
     st.stop()
 
+# --- Validate required columns ---
+# Uploads and the file-system dataset are checked before parsing; this
+# catches anything else before the charts index into missing columns
+column_errors, _ = check_columns(df.columns)
+if column_errors:
+    st.error("This dataset cannot be analysed: " + "; ".join(column_errors))
+    st.stop()
+
 # --- Validate 'Class' column ---
+# Unlabeled uploads are allowed; give them an all-legitimate label column.
+# The labeled frame shares the original's columns and is cached per frame,
+# so reruns keep their per-frame indexes and a shared frame is not modified
 if 'Class' not in df.columns:
     st.warning("'Class' column not found. Creating sample data for visualization purposes.")
-    df['Class'] = 0
+    df = per_frame(df, "unlabeled_as_legit", lambda frame: frame.assign(Class=np.int8(0)))
 
 # --- Sidebar Filters ---
 st.sidebar.markdown("### Filter Controls")
 st.sidebar.markdown("---")
 
-min_amt, max_amt = float(df['Amount'].min()), float(df['Amount'].max())
+# The amount index is built once per frame; the slider bounds and every
+# KPI below read from it instead of scanning the column on each rerun
+index = amount_index(df)
+min_amt, max_amt = index.amount_range()
 amount_range = st.sidebar.slider(
     "Transaction Amount Range",
     min_amt,
@@ -379,25 +416,51 @@ transaction_type = st.sidebar.multiselect(
     help="Select transaction types to display"
 )
 
+use_sampling = st.sidebar.checkbox(
+    "Sample rows for row-level views",
+    value=False,
+    help="Browse every fraudulent row and a random sample of legitimate rows in the data table, "
+         "so filter changes touch fewer rows; counts and charts stay exact"
+)
+legit_cap = st.sidebar.number_input(
+    "Legitimate rows to sample",
+    min_value=10_000,
+    value=DEFAULT_LEGIT_CAP,
+    step=10_000,
+    disabled=not use_sampling
+)
+
 st.sidebar.markdown("---")
 st.sidebar.markdown("### Quick Stats")
 
-# Map transaction types
-df['Transaction Type'] = df['Class'].map({0: 'Legitimate', 1: 'Fraudulent'})
+# Compact dtypes and categorical transaction types (no-op once normalized)
+df = compact_frame(df)
+
+# Apply filters: KPI counts come from the sorted Amount index by binary
+# search; rows are only gathered a page at a time for the data table
+kpi = index.counts(amount_range[0], amount_range[1], transaction_type)
+
+
+def box_caption(box):
+    shown = sum(len(stats['outliers']) for stats in box.values())
+    total = sum(stats['outlier_count'] for stats in box.values())
+    note = "" if shown == total else f"; {shown:,} of {total:,} outliers drawn, evenly spaced by rank"
+    return f"Exact quartiles and whiskers over {kpi['total']:,} rows{note}"
 
-# Apply filters
-filtered_df = df[
-    (df['Amount'].between(amount_range[0], amount_range[1])) &
-    (df['Transaction Type'].isin(transaction_type))
-]
 
 # Sidebar stats
-total_filtered = len(filtered_df)
-fraud_filtered = (filtered_df['Class'] == 1).sum()
+total_filtered = kpi['total']
+fraud_filtered = kpi['fraud']
 st.sidebar.metric("Filtered Transactions", f"{total_filtered:,}")
 st.sidebar.metric("Fraudulent", f"{fraud_filtered:,}")
 st.sidebar.metric("Legitimate", f"{total_filtered - fraud_filtered:,}")
 
+mem = per_frame(df, "memory_report", memory_report)
+st.sidebar.caption(
+    f"Memory: {mem['bytes'] / 1024 ** 2:,.1f} MB ({mem['bytes_per_row']:.0f} B/row) vs "
+    f"{mem['default_bytes'] / 1024 ** 2:,.1f} MB ({mem['default_bytes_per_row']:.0f} B/row) with default dtypes"
+)
+
 # --- Summary Metrics ---
 st.markdown("### Key Performance Indicators")
 
@@ -411,13 +474,13 @@ with col1:
             TOTAL TRANSACTIONS
         </div>
         <div style='background: linear-gradient(135deg, #00d4ff 0%, #00b4d8 100%); -webkit-background-clip: text; -webkit-text-fill-color: transparent; font-weight: 700; font-size: 2.2rem;'>
-            {len(filtered_df):,}
+            {kpi['total']:,}
         </div>
     </div>
     """, unsafe_allow_html=True)
 
 with col2:
-    fraud_count = (filtered_df['Class'] == 1).sum()
+    fraud_count = kpi['fraud']
     st.markdown(f"""
     <div class='metric-container'>
         <div style='color: #a0aec0; font-size: 0.95rem; font-weight: 500; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.5rem;'>
@@ -433,7 +496,7 @@ with col2:
     """, unsafe_allow_html=True)
 
 with col3:
-    legit_count = (filtered_df['Class'] == 0).sum()
+    legit_count = kpi['legit']
     st.markdown(f"""
     <div class='metric-container'>
         <div style='color: #a0aec0; font-size: 0.95rem; font-weight: 500; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.5rem;'>
@@ -449,7 +512,7 @@ with col3:
     """, unsafe_allow_html=True)
 
 with col4:
-    fraud_ratio = ((filtered_df['Class'] == 1).sum() / len(filtered_df) * 100) if len(filtered_df) > 0 else 0
+    fraud_ratio = (kpi['fraud'] / kpi['total'] * 100) if kpi['total'] > 0 else 0
     st.markdown(f"""
     <div class='metric-container'>
         <div style='color: #a0aec0; font-size: 0.95rem; font-weight: 500; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.5rem;'>
@@ -472,15 +535,19 @@ with col1:
         <div class='chart-title'>Transaction Distribution</div>
     """, unsafe_allow_html=True)
     
-    fraud_counts = filtered_df['Transaction Type'].value_counts().reset_index()
-    fraud_counts.columns = ['Transaction Type', 'Count']
+    fraud_counts = pd.DataFrame({
+        'Transaction Type': ['Legitimate', 'Fraudulent'],
+        'Count': [kpi['legit'], kpi['fraud']]
+    })
+    fraud_counts = fraud_counts[fraud_counts['Transaction Type'].isin(transaction_type)]
+    fraud_counts = fraud_counts.sort_values('Count', ascending=False)
     
     fig1 = px.pie(
         fraud_counts,
         values='Count',
         names='Transaction Type',
         color='Transaction Type',
-        color_discrete_map={'Legitimate': '#00CC96', 'Fraudulent': '#EF553B'},
+        color_discrete_map=TYPE_COLORS,
         hole=0.4
     )
     fig1.update_traces(
@@ -505,6 +572,7 @@ with col1:
         margin=dict(l=20, r=20, t=20, b=20)
     )
     st.plotly_chart(fig1, use_container_width=True)
+    st.caption(f"Exact: {kpi['total']:,} rows")
     st.markdown("</div>", unsafe_allow_html=True)
 
 with col2:
@@ -518,7 +586,7 @@ with col2:
         x='Transaction Type',
         y='Count',
         color='Transaction Type',
-        color_discrete_map={'Legitimate': '#00CC96', 'Fraudulent': '#EF553B'},
+        color_discrete_map=TYPE_COLORS,
         text='Count'
     )
     fig2.update_traces(
@@ -537,6 +605,7 @@ with col2:
         margin=dict(l=20, r=20, t=20, b=20)
     )
     st.plotly_chart(fig2, use_container_width=True)
+    st.caption(f"Exact: {kpi['total']:,} rows")
     st.markdown("</div>", unsafe_allow_html=True)
 
 # --- Row 2: Amount Analysis ---
@@ -550,16 +619,20 @@ with col1:
         <div class='chart-title'>Transaction Amount Distribution</div>
     """, unsafe_allow_html=True)
     
-    fig3 = px.histogram(
-        filtered_df,
-        x='Amount',
-        color='Transaction Type',
-        nbins=50,
-        color_discrete_map={'Legitimate': '#00CC96', 'Fraudulent': '#EF553B'},
-        barmode='overlay',
-        opacity=0.7
-    )
+    hist = amount_histogram(index, amount_range[0], amount_range[1], transaction_type)
+    edges = hist['edges']
+    fig3 = go.Figure()
+    for type_name, counts in hist['counts'].items():
+        fig3.add_trace(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=edges[1] - edges[0],
+            name=type_name,
+            marker_color=TYPE_COLORS[type_name],
+            opacity=0.7
+        ))
     fig3.update_layout(
+        barmode='overlay',
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(0,0,0,0)',
         font=dict(color='white', size=12),
@@ -576,6 +649,7 @@ with col1:
         margin=dict(l=20, r=20, t=20, b=20)
     )
     st.plotly_chart(fig3, use_container_width=True)
+    st.caption(f"Exact: {kpi['total']:,} rows in {len(edges) - 1} bins")
     st.markdown("</div>", unsafe_allow_html=True)
 
 with col2:
@@ -584,14 +658,26 @@ with col2:
         <div class='chart-title'>Amount Comparison Box Plot</div>
     """, unsafe_allow_html=True)
     
-    fig4 = px.box(
-        filtered_df,
-        x='Transaction Type',
-        y='Amount',
-        color='Transaction Type',
-        color_discrete_map={'Legitimate': '#00CC96', 'Fraudulent': '#EF553B'},
-        points='outliers'
-    )
+    box = amount_box_stats(index, amount_range[0], amount_range[1], transaction_type)
+    fig4 = go.Figure()
+    for type_name, stats in box.items():
+        fig4.add_trace(go.Box(
+            x=[type_name],
+            q1=[stats['q1']],
+            median=[stats['median']],
+            q3=[stats['q3']],
+            lowerfence=[stats['lowerfence']],
+            upperfence=[stats['upperfence']],
+            name=type_name,
+            marker_color=TYPE_COLORS[type_name]
+        ))
+        fig4.add_trace(go.Scatter(
+            x=[type_name] * len(stats['outliers']),
+            y=stats['outliers'],
+            mode='markers',
+            name=type_name,
+            marker=dict(color=TYPE_COLORS[type_name], size=4)
+        ))
     fig4.update_layout(
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(0,0,0,0)',
@@ -603,20 +689,20 @@ with col2:
         margin=dict(l=20, r=20, t=20, b=20)
     )
     st.plotly_chart(fig4, use_container_width=True)
+    st.caption(box_caption(box))
     st.markdown("</div>", unsafe_allow_html=True)
 
 # --- Correlation Heatmap (if enough numeric columns) ---
 st.markdown("<br>", unsafe_allow_html=True)
-numeric_cols = filtered_df.select_dtypes(include=['float64', 'int64']).columns
-if len(numeric_cols) > 3:
+corr_index = correlation_index(df)
+if len(corr_index.columns) > 3:
     st.markdown("""
     <div class='chart-container'>
         <div class='chart-title'>Feature Correlation Matrix</div>
     """, unsafe_allow_html=True)
     
-    # Limit to first 15 columns for better visualization
-    cols_to_show = list(numeric_cols[:15])
-    corr = filtered_df[cols_to_show].corr()
+    # All numeric columns, merged from precomputed block co-moments
+    corr = corr_index.correlation(amount_range[0], amount_range[1], transaction_type)
     
     fig5 = px.imshow(
         corr,
@@ -635,29 +721,193 @@ if len(numeric_cols) > 3:
         margin=dict(l=20, r=20, t=20, b=20)
     )
     st.plotly_chart(fig5, use_container_width=True)
+    st.caption(f"Exact: {kpi['total']:,} rows")
     st.markdown("</div>", unsafe_allow_html=True)
 
+# --- Alert Threshold (scored uploads only) ---
+# Both classes present, read from the amount index's prefix totals
+if SCORE_COLUMN in df.columns and index.fraud_prefix[-1] > 0 and index.legit_prefix[-1] > 0:
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("### Alert Threshold")
+
+    # Scores are sorted once per frame; every slider position is a binary
+    # search into the cumulative TP/FP counts, over all rows
+    curves = score_curves(df)
+    threshold = st.slider("Alert when fraud score is at least", 0.0, 1.0, DEFAULT_THRESHOLD, 0.001, format="%.3f")
+    at = curves.at(threshold)
+
+    t_col1, t_col2, t_col3, t_col4 = st.columns(4)
+    t_col1.metric("Alerts", f"{at['alerts']:,}", f"{at['alert_rate']:.2%} of transactions", delta_color="off")
+    t_col2.metric("Precision", f"{at['precision']:.1%}" if at['alerts'] else "N/A")
+    t_col3.metric("Recall", f"{at['recall']:.1%}")
+    t_col4.metric("False Positive Rate", f"{at['fpr']:.3%}")
+    st.caption(f"Exact: all {len(curves):,} scored rows")
+
+    curve = curves.curves()
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.markdown("""
+        <div class='chart-container'>
+            <div class='chart-title'>Confusion Matrix</div>
+        """, unsafe_allow_html=True)
+
+        fig6 = px.imshow(
+            [[at['tn'], at['fp']], [at['fn'], at['tp']]],
+            x=['Predicted Legitimate', 'Predicted Fraudulent'],
+            y=['Legitimate', 'Fraudulent'],
+            text_auto=',',
+            color_continuous_scale='Blues'
+        )
+        fig6.update_layout(
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='white', size=12),
+            coloraxis_showscale=False,
+            height=400,
+            margin=dict(l=20, r=20, t=20, b=20)
+        )
+        st.plotly_chart(fig6, use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(f"""
+        <div class='chart-container'>
+            <div class='chart-title'>ROC Curve (AUC {curve['roc_auc']:.4f})</div>
+        """, unsafe_allow_html=True)
+
+        fig7 = go.Figure()
+        fig7.add_trace(go.Scatter(x=curve['fpr'], y=curve['tpr'], mode='lines', line=dict(color='#00b4d8')))
+        fig7.add_trace(go.Scatter(x=[at['fpr']], y=[at['recall']], mode='markers',
+                                  marker=dict(color=TYPE_COLORS['Fraudulent'], size=10)))
+        fig7.update_layout(
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='white', size=12),
+            xaxis=dict(title='False Positive Rate', gridcolor='rgba(0, 180, 216, 0.1)'),
+            yaxis=dict(title='True Positive Rate', gridcolor='rgba(0, 180, 216, 0.1)'),
+            showlegend=False,
+            height=400,
+            margin=dict(l=20, r=20, t=20, b=20)
+        )
+        st.plotly_chart(fig7, use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f"""
+        <div class='chart-container'>
+            <div class='chart-title'>Precision-Recall Curve (AP {curve['pr_auc']:.4f})</div>
+        """, unsafe_allow_html=True)
+
+        fig8 = go.Figure()
+        fig8.add_trace(go.Scatter(x=curve['recall'], y=curve['precision'], mode='lines', line=dict(color='#00b4d8')))
+        if at['alerts']:
+            fig8.add_trace(go.Scatter(x=[at['recall']], y=[at['precision']], mode='markers',
+                                      marker=dict(color=TYPE_COLORS['Fraudulent'], size=10)))
+        fig8.update_layout(
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='white', size=12),
+            xaxis=dict(title='Recall', gridcolor='rgba(0, 180, 216, 0.1)'),
+            yaxis=dict(title='Precision', gridcolor='rgba(0, 180, 216, 0.1)'),
+            showlegend=False,
+            height=400,
+            margin=dict(l=20, r=20, t=20, b=20)
+        )
+        st.plotly_chart(fig8, use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
 # --- Data Table ---
 st.markdown("<br>", unsafe_allow_html=True)
+
+# Pages are slices of precomputed sort orders, so any page of any size
+# frame costs the same; with sampling on, the fraud-preserving sample is
+# browsed instead of the full frame
+sample = stratified_sample(df, int(legit_cap)) if use_sampling else None
+table_df = sample.rows(df) if sample is not None else df
+pages = row_pages(table_df)
+
 st.markdown("### Transaction Data Explorer")
 
 # Add search/filter option
-search_col1, search_col2 = st.columns([3, 1])
+search_col1, search_col2, search_col3 = st.columns([2, 1, 1])
 with search_col1:
-    show_count = st.slider("Number of rows to display", 10, 100, 20, 10)
+    sort_key = st.selectbox("Sort by", options=pages.sort_keys(table_df))
+    sort_descending = st.checkbox("Descending", value=False)
 with search_col2:
+    page_size = st.selectbox("Rows per page", options=[20, 50, 100, 500], index=0)
     show_fraud_only = st.checkbox("Show Fraudulent Only", value=False)
-
-display_df = filtered_df[filtered_df['Class'] == 1] if show_fraud_only else filtered_df
+with search_col3:
+    # Explanations need the booster and every feature it was trained on.
+    # The features come from the model's metadata; the model itself is
+    # only loaded once explanations are switched on
+    features = expected_features()
+    can_explain = model_available() and not any(col not in df.columns for col in features or ())
+    explain_rows = st.checkbox(
+        "Explain rows",
+        value=False,
+        disabled=not can_explain,
+        help="Show each row's strongest feature contributions to its fraud score"
+    )
+explain_model = load_model() if explain_rows and can_explain else None
+if explain_model is not None and missing_features(df, explain_model):
+    # A model saved without metadata is only checked once loaded
+    st.warning("This dataset lacks some of the model's feature columns, so rows cannot be explained.")
+    explain_model = None
+
+selection = pages.selection(table_df, sort_key, amount_range[0], amount_range[1], transaction_type,
+                            fraud_only=show_fraud_only, descending=sort_descending)
+with search_col3:
+    page = st.number_input("Page", min_value=1, max_value=page_count(selection, page_size), value=1, step=1)
+page_df = page_rows(table_df, selection, int(page), page_size)
+
+first_row = (int(page) - 1) * page_size
+table_caption = f"Rows {first_row + 1:,}-{first_row + len(page_df):,} of {len(selection):,} matching"
+if sample is not None:
+    table_caption += f" ({sample.describe()})"
+
+# Contributions are computed only for the rows on screen, in one batch,
+# and cached per row so paging back and forth reuses them
+if explain_model is not None and len(page_df):
+    contribs = row_explainer(df, explain_model).explain(df, page_df.index)
+    page_df = top_contributions(contribs).join(page_df)
 
 st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
 st.dataframe(
-    display_df.head(show_count),
+    page_df,
     use_container_width=True,
     height=400
 )
+st.caption(table_caption)
 st.markdown("</div>", unsafe_allow_html=True)
 
+if explain_model is not None and len(page_df):
+    selected_row = st.selectbox("Explain transaction", options=list(page_df.index))
+    row = contribs.loc[selected_row].drop(BIAS_COLUMN)
+    row = row[row.abs().sort_values(ascending=False).index[:10]][::-1]
+
+    st.markdown("""
+    <div class='chart-container'>
+        <div class='chart-title'>Feature Contributions (log-odds)</div>
+    """, unsafe_allow_html=True)
+    fig9 = go.Figure(go.Bar(
+        x=row.to_numpy(),
+        y=row.index,
+        orientation='h',
+        marker_color=[TYPE_COLORS['Fraudulent'] if v > 0 else TYPE_COLORS['Legitimate'] for v in row.to_numpy()]
+    ))
+    fig9.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white', size=12),
+        xaxis=dict(title='Contribution', gridcolor='rgba(0, 180, 216, 0.1)'),
+        yaxis=dict(title=''),
+        height=400,
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+    st.plotly_chart(fig9, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
 # --- Footer ---
 st.markdown("""
 <div class='footer'>
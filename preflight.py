@@ -0,0 +1,163 @@
+import csv
+import io
+import time
+
+import numpy as np
+
+from schema import CSV_DTYPES, LABEL_COLUMN
+
+# Uploads may be unlabeled (they are scored, label metrics show N/A);
+# training data needs the label too
+REQUIRED_COLUMNS = ("Amount",)
+TRAINING_COLUMNS = ("Amount", LABEL_COLUMN)
+SAMPLE_BYTES = 256 * 1024
+SAMPLE_ROWS = 1_000
+MAX_LISTED = 8
+
+
+def _listing(names):
+    names = list(names)
+    shown = ", ".join(names[:MAX_LISTED])
+    return shown + (f" (+{len(names) - MAX_LISTED} more)" if len(names) > MAX_LISTED else "")
+
+
+def _read_head(source, sample_bytes):
+    # Paths are opened; file objects are read from the start and rewound
+    # so the full parse still sees the whole file
+    if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__"):
+        with open(source, "rb") as f:
+            head = f.read(sample_bytes + 1)
+    else:
+        source.seek(0)
+        head = source.read(sample_bytes + 1)
+        source.seek(0)
+    complete = len(head) <= sample_bytes
+    return head[:sample_bytes], complete
+
+
+def check_columns(columns, expected_features=None, required=REQUIRED_COLUMNS):
+    """Column-level problems as ``(errors, missing_features)``."""
+    columns = [str(col) for col in columns]
+    errors = []
+    duplicates = sorted({col for col in columns if columns.count(col) > 1})
+    if duplicates:
+        errors.append(f"duplicate column names: {_listing(duplicates)}")
+    missing = [col for col in required if col not in columns]
+    if missing:
+        errors.append(f"missing required column{'s' if len(missing) > 1 else ''} {_listing(missing)} "
+                      f"(found: {_listing(columns)})")
+    missing_features = [col for col in expected_features or () if col not in columns]
+    return errors, missing_features
+
+
+def _non_numeric(values):
+    """First value that does not parse as a number (blanks are missing values), or None."""
+    present = [value for value in values if value.strip()]
+    try:
+        np.array(present, dtype=np.float64)
+        return None
+    except ValueError:
+        for value in present:
+            try:
+                float(value)
+            except ValueError:
+                return value
+    return None
+
+
+def validate_csv(source, expected_features=None, require_features=False, required=REQUIRED_COLUMNS,
+                 sample_bytes=SAMPLE_BYTES, sample_rows=SAMPLE_ROWS):
+    """Check a CSV's header and first rows before it is parsed in full.
+
+    Only the first ``sample_bytes`` are read, so the cost does not depend
+    on the file size. Checks the required columns, that the known numeric
+    columns (and ``expected_features``, e.g. the model's) parse as numbers,
+    that ``Class`` is 0/1, and that rows have as many fields as the header.
+    Features the model expects but the file lacks are an error with
+    ``require_features``, otherwise a warning (scoring is skipped).
+
+    Returns a dict with ``ok``, ``errors``, ``warnings``, ``columns``,
+    ``missing_features``, ``sample_rows`` and ``seconds``.
+    """
+    start = time.perf_counter()
+    report = {"ok": False, "errors": [], "warnings": [], "columns": [], "missing_features": [],
+              "sample_rows": 0}
+
+    def done():
+        report["ok"] = not report["errors"]
+        report["seconds"] = time.perf_counter() - start
+        return report
+
+    head, complete = _read_head(source, sample_bytes)
+    if not head.strip():
+        report["errors"].append("the file is empty")
+        return done()
+    if not complete:
+        # Drop the partial last line of the sample
+        end = head.rfind(b"\n")
+        if end < 0:
+            report["errors"].append(f"no line break in the first {sample_bytes // 1024:,} KB; not a CSV file")
+            return done()
+        head = head[:end + 1]
+    try:
+        text = head.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        report["errors"].append(f"not UTF-8 text (invalid byte at offset {e.start:,})")
+        return done()
+
+    reader = csv.reader(io.StringIO(text, newline=""))
+    header = [name.strip() for name in next(reader)]
+    report["columns"] = header
+    if len(header) == 1 and any(sep in header[0] for sep in (";", "\t", "|")):
+        report["errors"].append(f"only one column, {header[0][:60]!r}; the file does not look comma-separated")
+        return done()
+
+    errors, missing_features = check_columns(header, expected_features, required)
+    report["errors"] += errors
+    report["missing_features"] = missing_features
+    if missing_features:
+        message = (f"{len(missing_features)} of the model's {len(expected_features)} feature columns "
+                   f"are missing: {_listing(missing_features)}")
+        if require_features:
+            report["errors"].append(message)
+        else:
+            report["warnings"].append(message + "; scoring will be skipped")
+
+    rows, line_numbers = [], []
+    for row in reader:
+        if not row:
+            continue
+        if len(row) != len(header):
+            report["errors"].append(f"line {reader.line_num:,} has {len(row)} fields, the header has {len(header)}")
+            break
+        rows.append(row)
+        line_numbers.append(reader.line_num)
+        if len(rows) >= sample_rows:
+            break
+    report["sample_rows"] = len(rows)
+    if not rows:
+        report["warnings"].append("no data rows after the header")
+        return done()
+
+    numeric = [col for col in header if col in CSV_DTYPES or col in (expected_features or ())]
+    for col in numeric:
+        values = [row[header.index(col)] for row in rows]
+        bad = _non_numeric(values)
+        if bad is not None:
+            line_number = line_numbers[values.index(bad)]
+            report["errors"].append(f"column {col!r} is not numeric: line {line_number:,} has {bad[:40]!r}")
+        elif col == LABEL_COLUMN:
+            # Parsed as int8, so blanks and "1.0" would fail the full parse too
+            unexpected = sorted({value.strip() for value in values} - {"0", "1"})
+            if unexpected:
+                report["errors"].append(f"column {col!r} must be 0 or 1, found "
+                                        f"{_listing(repr(value) for value in unexpected)}")
+    return done()
+
+
+def check_csv(source, **kwargs):
+    """:func:`validate_csv`, raising ``ValueError`` with every error found."""
+    report = validate_csv(source, **kwargs)
+    if report["errors"]:
+        raise ValueError("; ".join(report["errors"]))
+    return report
@@ -0,0 +1,111 @@
+import collections
+
+import numpy as np
+
+from amount_index import amount_index
+from frame_cache import per_frame
+from schema import LABEL_COLUMN
+from scoring import SCORE_COLUMN
+
+SORT_COLUMNS = {"Amount": "Amount", "Time": "Time", "Fraud score": SCORE_COLUMN}
+MAX_SELECTIONS = 8
+
+
+class RowPages:
+    """Precomputed row orders for paging through a frame.
+
+    Sort orders (by Amount, Time and score) and their fraud-only subsets
+    are computed once per frame on first use. A filter state resolves to a
+    position array in the requested order (a view when no filter applies,
+    cached otherwise), and a page is ``df.iloc`` of one slice of it, so
+    page 10,000 costs the same as page one.
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self._orders = {}
+        self._fraud_orders = {}
+        self._selections = collections.OrderedDict()
+        self._is_fraud = df[LABEL_COLUMN].to_numpy() == 1
+        self._min_amount = float(df["Amount"].min()) if len(df) else 0.0
+        self._max_amount = float(df["Amount"].max()) if len(df) else 0.0
+
+    def sort_keys(self, df):
+        return ["Row order"] + [key for key, col in SORT_COLUMNS.items() if col in df.columns]
+
+    def order(self, df, key):
+        """Row positions sorted by ``key`` (ascending; ``Row order`` is the frame's own)."""
+        if key not in self._orders:
+            if key == "Row order":
+                order = np.arange(self.n_rows)
+            elif key == "Amount":
+                # Reuse the sort the filters already did
+                order = amount_index(df).order
+            else:
+                order = np.argsort(df[SORT_COLUMNS[key]].to_numpy(), kind="stable")
+            self._orders[key] = order
+        return self._orders[key]
+
+    def fraud_order(self, df, key):
+        """Positions of fraudulent rows only, in ``key`` order."""
+        if key not in self._fraud_orders:
+            order = self.order(df, key)
+            self._fraud_orders[key] = order[self._is_fraud[order]]
+        return self._fraud_orders[key]
+
+    def selection(self, df, key, low, high, types, fraud_only=False, descending=False):
+        """Positions of the rows matching the filters, in display order."""
+        want_fraud = "Fraudulent" in types
+        want_legit = "Legitimate" in types and not fraud_only
+        full_range = low <= self._min_amount and high >= self._max_amount
+
+        if not want_fraud and not want_legit:
+            selected = np.empty(0, dtype=np.int64)
+        elif want_legit and want_fraud and full_range:
+            selected = self.order(df, key)
+        else:
+            cache_key = (key, low, high, want_fraud, want_legit)
+            selected = self._selections.get(cache_key)
+            if selected is None:
+                selected = self._filter(df, key, low, high, want_fraud, want_legit, full_range)
+                self._selections[cache_key] = selected
+                if len(self._selections) > MAX_SELECTIONS:
+                    self._selections.popitem(last=False)
+            self._selections.move_to_end(cache_key)
+        return selected[::-1] if descending else selected
+
+    def _filter(self, df, key, low, high, want_fraud, want_legit, full_range):
+        if not want_legit:
+            # Fraud rows are few; filter the precomputed fraud order
+            candidates = self.fraud_order(df, key)
+            if full_range:
+                return candidates
+            amounts = df["Amount"].to_numpy()[candidates]
+            return candidates[(amounts >= low) & (amounts <= high)]
+
+        order = self.order(df, key)
+        if key == "Amount":
+            # Amount order is already range-sorted: the range is one slice
+            lo, hi = amount_index(df).bounds(low, high)
+            candidates = order[lo:hi]
+        else:
+            amounts = df["Amount"].to_numpy()[order]
+            candidates = order if full_range else order[(amounts >= low) & (amounts <= high)]
+        if want_fraud:
+            return candidates
+        return candidates[~self._is_fraud[candidates]]
+
+
+def page_count(selection, page_size):
+    return max(1, -(-len(selection) // page_size))
+
+
+def page_rows(df, selection, page, page_size):
+    """Rows of 1-based ``page``; only those rows are gathered."""
+    start = (page - 1) * page_size
+    return df.iloc[selection[start:start + page_size]]
+
+
+def row_pages(df):
+    """Return the (cached) :class:`RowPages` for ``df``."""
+    return per_frame(df, "row_pages", RowPages)
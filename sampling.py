@@ -0,0 +1,73 @@
+import numpy as np
+
+from frame_cache import per_frame
+from schema import LABEL_COLUMN
+
+DEFAULT_LEGIT_CAP = 200_000
+RESERVOIR_CHUNK_ROWS = 1_000_000
+
+
+def reservoir_sample(positions, cap, rng, chunk_rows=RESERVOIR_CHUNK_ROWS):
+    """Uniform sample of at most ``cap`` of ``positions`` in one pass.
+
+    Every item gets a random key and the reservoir keeps the ``cap``
+    largest keys seen so far, so the input is consumed a chunk at a time
+    and memory is bounded by ``cap + chunk_rows``. Returns sorted positions.
+    """
+    if len(positions) <= cap:
+        return np.asarray(positions)
+
+    kept = np.empty(0, dtype=np.asarray(positions).dtype)
+    keys = np.empty(0, dtype=np.float64)
+    for start in range(0, len(positions), chunk_rows):
+        chunk = positions[start:start + chunk_rows]
+        kept = np.concatenate([kept, chunk])
+        keys = np.concatenate([keys, rng.random(len(chunk))])
+        if len(kept) > cap:
+            top = np.argpartition(keys, len(keys) - cap)[-cap:]
+            kept, keys = kept[top], keys[top]
+    return np.sort(kept)
+
+
+class StratifiedSample:
+    """Every fraudulent row plus a reservoir sample of legitimate rows.
+
+    Row-level views (tables, scatter-style plots) read :meth:`rows`, whose
+    size is bounded by the number of frauds plus ``legit_cap`` however large
+    the full frame grows. Counts and aggregates should keep using the full
+    frame; the totals here are there to label sampled views.
+    """
+
+    def __init__(self, df, legit_cap=DEFAULT_LEGIT_CAP, seed=0):
+        labels = df[LABEL_COLUMN].to_numpy()
+        fraud = np.flatnonzero(labels == 1)
+        legit = np.flatnonzero(labels != 1)
+        sampled_legit = reservoir_sample(legit, legit_cap, np.random.default_rng(seed))
+
+        self.legit_cap = legit_cap
+        self.fraud = len(fraud)
+        self.legit_total = len(legit)
+        self.legit_sampled = len(sampled_legit)
+        self.sampled = self.legit_sampled < self.legit_total
+        self.positions = np.union1d(fraud, sampled_legit)
+        # Only the sampled copy is kept; holding ``df`` itself would keep
+        # the frame alive through the per-frame cache
+        self._frame = df.iloc[self.positions] if self.sampled else None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def rows(self, df):
+        """The sampled rows of ``df`` (``df`` itself when nothing was dropped)."""
+        return self._frame if self.sampled else df
+
+    def describe(self):
+        if not self.sampled:
+            return f"Exact: all {self.fraud + self.legit_total:,} rows"
+        return (f"Sampled: all {self.fraud:,} fraudulent + {self.legit_sampled:,} of "
+                f"{self.legit_total:,} legitimate rows")
+
+
+def stratified_sample(df, legit_cap=DEFAULT_LEGIT_CAP, seed=0):
+    """Return the (cached) :class:`StratifiedSample` of ``df``."""
+    return per_frame(df, f"sample:{legit_cap}:{seed}", lambda frame: StratifiedSample(frame, legit_cap, seed))
@@ -0,0 +1,73 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+# --- Transaction schema ---
+PCA_COLUMNS = [f"V{i}" for i in range(1, 29)]
+FEATURE_COLUMNS = ["Time"] + PCA_COLUMNS + ["Amount"]
+LABEL_COLUMN = "Class"
+TYPE_COLUMN = "Transaction Type"
+CLASS_LABELS = {0: "Legitimate", 1: "Fraudulent"}
+TRANSACTION_TYPES = pd.CategoricalDtype(["Legitimate", "Fraudulent"])
+
+# Parse types for the known CSV columns, so readers skip type inference and
+# produce the compact dtypes directly (other columns are still inferred)
+CSV_DTYPES = {**{col: np.float32 for col in FEATURE_COLUMNS}, LABEL_COLUMN: np.int8}
+
+
+def compact_frame(df):
+    """Normalize a transactions frame to the compact in-memory schema.
+
+    Float columns become float32, integer columns (including ``Class``) are
+    downcast to the smallest integer type that fits, and ``Transaction Type``
+    is derived once from ``Class`` as a categorical. Columns are replaced in
+    place, so the caller's frame is updated without a full copy.
+    """
+    for col in df.columns:
+        dtype = df[col].dtype
+        if col == TYPE_COLUMN:
+            continue
+        if pd.api.types.is_float_dtype(dtype) and dtype != np.float32:
+            df[col] = df[col].astype(np.float32)
+        elif pd.api.types.is_integer_dtype(dtype) and dtype.itemsize > 1:
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+
+    if LABEL_COLUMN in df.columns:
+        existing = df[TYPE_COLUMN].dtype if TYPE_COLUMN in df.columns else None
+        if existing != TRANSACTION_TYPES:
+            labels = df[LABEL_COLUMN].to_numpy()
+            codes = np.where((labels == 0) | (labels == 1), labels, -1).astype(np.int8)
+            df[TYPE_COLUMN] = pd.Categorical.from_codes(codes, dtype=TRANSACTION_TYPES)
+    return df
+
+
+def _default_dtype_bytes(df):
+    # What the same frame costs with pandas' default dtypes: 8-byte numbers
+    # and the type label as an object column of Python strings.
+    total = int(df.index.memory_usage())
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            counts = series.value_counts()
+            total += 8 * len(series) + sum(sys.getsizeof(str(label)) * n for label, n in counts.items())
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            total += 8 * len(series)
+        else:
+            total += int(series.memory_usage(index=False, deep=True))
+    return total
+
+
+def memory_report(df):
+    """Bytes per row of ``df`` compared to the same data in default pandas dtypes."""
+    rows = max(len(df), 1)
+    actual = int(df.memory_usage(index=True, deep=True).sum())
+    default = _default_dtype_bytes(df)
+    return {
+        "rows": len(df),
+        "bytes": actual,
+        "bytes_per_row": actual / rows,
+        "default_bytes": default,
+        "default_bytes_per_row": default / rows,
+        "ratio": actual / default if default else 0.0,
+    }
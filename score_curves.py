@@ -0,0 +1,107 @@
+import numpy as np
+
+from frame_cache import per_frame
+from schema import LABEL_COLUMN
+from scoring import SCORE_COLUMN
+
+DEFAULT_CURVE_POINTS = 500
+
+
+class ScoreCurves:
+    """Model scores sorted once, with cumulative fraud/legit counts.
+
+    Built in O(n log n). The confusion matrix at any threshold is then one
+    binary search and two prefix-sum lookups, and ROC / PR curves are read
+    off the same arrays.
+    """
+
+    def __init__(self, scores, labels):
+        order = np.argsort(scores, kind="stable")
+        self.sorted_scores = scores[order]
+        is_fraud = labels[order] == 1
+
+        # prefix[i] = number of rows among the i lowest-scored rows
+        self.fraud_prefix = np.zeros(len(scores) + 1, dtype=np.int64)
+        np.cumsum(is_fraud, out=self.fraud_prefix[1:])
+        self.legit_prefix = np.arange(len(scores) + 1, dtype=np.int64) - self.fraud_prefix
+        self.fraud = int(self.fraud_prefix[-1])
+        self.legit = int(self.legit_prefix[-1])
+
+        # Each distinct score is a threshold; position p alerts on rows p..n-1
+        changes = np.flatnonzero(np.diff(self.sorted_scores)) + 1
+        self.threshold_positions = np.concatenate([[0], changes, [len(scores)]])
+        self._curves = {}
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(df[SCORE_COLUMN].to_numpy(), df[LABEL_COLUMN].to_numpy())
+
+    def __len__(self):
+        return len(self.sorted_scores)
+
+    def _counts(self, positions):
+        tp = self.fraud - self.fraud_prefix[positions]
+        fp = self.legit - self.legit_prefix[positions]
+        return tp, fp
+
+    def at(self, threshold):
+        """Alert volume, confusion matrix, precision and recall for ``score >= threshold``."""
+        scalar = self.sorted_scores.dtype.type
+        position = int(np.searchsorted(self.sorted_scores, scalar(threshold), side="left"))
+        tp, fp = (int(v) for v in self._counts(position))
+        alerts = tp + fp
+        return {
+            "threshold": float(threshold),
+            "alerts": alerts,
+            "alert_rate": alerts / len(self) if len(self) else 0.0,
+            "tp": tp,
+            "fp": fp,
+            "fn": self.fraud - tp,
+            "tn": self.legit - fp,
+            "precision": tp / alerts if alerts else float("nan"),
+            "recall": tp / self.fraud if self.fraud else float("nan"),
+            "fpr": fp / self.legit if self.legit else float("nan"),
+        }
+
+    def curves(self, max_points=DEFAULT_CURVE_POINTS):
+        """ROC and PR curves over the distinct thresholds, thinned to ``max_points``.
+
+        The areas are computed over every threshold, not just the plotted
+        ones. The result is kept, so reruns do not recompute it.
+        """
+        if max_points not in self._curves:
+            self._curves[max_points] = self._build_curves(max_points)
+        return self._curves[max_points]
+
+    def _build_curves(self, max_points):
+        tp, fp = self._counts(self.threshold_positions)
+        tpr = tp / max(self.fraud, 1)
+        fpr = fp / max(self.legit, 1)
+        alerts = tp + fp
+        precision = np.divide(tp, alerts, out=np.ones(len(tp)), where=alerts > 0)
+
+        # Positions run from "alert on everything" to "alert on nothing", so
+        # FPR and recall fall along the arrays
+        roc_auc = pr_auc = float("nan")
+        if self.fraud and self.legit:
+            roc_auc = float(np.sum(-np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+        if self.fraud:
+            pr_auc = float(np.sum(-np.diff(tpr) * precision[:-1]))
+
+        keep = np.unique(np.linspace(0, len(tp) - 1, min(max_points, len(tp))).round().astype(np.int64))
+        positions = self.threshold_positions[keep]
+        thresholds = np.append(self.sorted_scores, np.inf)[positions]
+        return {
+            "thresholds": thresholds,
+            "tpr": tpr[keep],
+            "fpr": fpr[keep],
+            "precision": precision[keep],
+            "recall": tpr[keep],
+            "roc_auc": roc_auc,
+            "pr_auc": pr_auc,
+        }
+
+
+def score_curves(df):
+    """Return the (cached) :class:`ScoreCurves` for a scored, labeled ``df``."""
+    return per_frame(df, "score_curves", ScoreCurves.from_frame)
@@ -0,0 +1,190 @@
+import os
+import time
+
+import numpy as np
+
+MODEL_PATH = "model/fraud_model.ubj"
+LEGACY_MODEL_PATH = "model/fraud_model.pkl"
+SCORE_COLUMN = "fraud_score"
+PREDICTION_COLUMN = "predicted_class"
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_THRESHOLD = 0.5
+BACKENDS = ("xgboost", "numpy", "auto")
+
+# --- Model cache ---
+# One loaded model per process, shared by every Streamlit session and rerun.
+# Reloaded only when the file on disk changes.
+_model_cache = {}
+
+
+def default_model_path():
+    """The native booster if training wrote one, else the joblib pickle."""
+    return MODEL_PATH if os.path.exists(MODEL_PATH) else LEGACY_MODEL_PATH
+
+
+def model_available(path=None):
+    return os.path.exists(path or default_model_path())
+
+
+def _file_fingerprint(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_model(path=None, backend="xgboost"):
+    """Return the trained model, loading it at most once per process.
+
+    ``.ubj`` / ``.json`` files are loaded as raw boosters (no scikit-learn
+    import); anything else is treated as a joblib pickle. With
+    ``backend="numpy"`` the trees are run by :class:`compiled_model.CompiledForest`
+    instead, read from an exported ``.forest.npz`` when one is up to date and
+    compiled from the booster otherwise. ``backend="auto"`` uses the compiled
+    forest for small batches only (see :class:`compiled_model.SmallBatchModel`),
+    which is what suits online scoring; whole files are faster on the booster.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+
+    key = os.path.abspath(path or default_model_path())
+    fingerprint = _file_fingerprint(key)
+
+    cached = _model_cache.get((key, backend))
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    if backend == "auto":
+        from compiled_model import SmallBatchModel
+        model = SmallBatchModel(load_model(key), load_model(key, "numpy"))
+    elif backend == "numpy":
+        from compiled_model import CompiledForest, compiled_path
+        exported = key if key.endswith(".npz") else compiled_path(key)
+        if os.path.exists(exported) and os.stat(exported).st_mtime_ns >= fingerprint[0]:
+            model = CompiledForest.load(exported)
+        else:
+            model = CompiledForest.from_booster(load_model(key).get_booster())
+    elif key.endswith((".ubj", ".json")):
+        from model_store import load_native
+        model = load_native(key)
+    else:
+        import joblib
+        model = joblib.load(key)
+    _model_cache[(key, backend)] = (fingerprint, model)
+    return model
+
+
+def model_features(model):
+    """Feature columns the model was fitted on, in training order."""
+    names = getattr(model, "feature_names_in_", None)
+    if names is None:
+        names = model.get_booster().feature_names
+    return [str(name) for name in names]
+
+
+def expected_features(path=None):
+    """Model features from the metadata file written next to it, without loading the model.
+
+    None when there is no model or it was saved without metadata.
+    """
+    from model_store import read_metadata
+
+    path = path or default_model_path()
+    if not os.path.exists(path):
+        return None
+    return read_metadata(path).get("features") or None
+
+
+def missing_features(df, model):
+    return [col for col in model_features(model) if col not in df.columns]
+
+
+def load_cascade(path=None):
+    """First-stage model saved next to ``path`` by ``train_model.py --cascade``, or None."""
+    from cascade import Cascade, cascade_path
+
+    stage_path = cascade_path(path or default_model_path())
+    if not os.path.exists(stage_path):
+        return None
+    key = os.path.abspath(stage_path)
+    mtime = os.stat(key).st_mtime_ns
+    cached = _model_cache.get((key, "cascade"))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    stage = Cascade.load(key)
+    _model_cache[(key, "cascade")] = (mtime, stage)
+    return stage
+
+
+def scoring_variant(path=None, backend="xgboost", cascade=False):
+    """Short key for what ``score_frame`` would add to a frame with this setup.
+
+    Changes whenever the model (or the cascade stage) file changes, so
+    frames scored under an older model are never served as current.
+    """
+    import hashlib
+
+    path = path or default_model_path()
+    if not os.path.exists(path):
+        return "unscored"
+    parts = [os.path.abspath(path), *_file_fingerprint(path), backend]
+    if cascade:
+        from cascade import cascade_path
+        stage_path = cascade_path(path)
+        if os.path.exists(stage_path):
+            parts += ["cascade", *_file_fingerprint(stage_path)]
+    return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:16]
+
+
+def score_frame(df, model=None, chunk_size=DEFAULT_CHUNK_SIZE, threshold=DEFAULT_THRESHOLD, cascade=None):
+    """Attach fraud probabilities and predicted labels to ``df`` in place.
+
+    Features are gathered into one contiguous float32 matrix; each chunk
+    passed to ``predict_proba`` is a row-slice view of it and writes into a
+    preallocated score array, so nothing is copied per chunk.
+
+    With a :class:`cascade.Cascade`, every row is first scored by the cheap
+    stage; only rows at or above its threshold go to ``model``. The rest get
+    a score of 0 and are predicted legitimate: the first-stage probability
+    comes from a different model and would not rank consistently with the
+    booster's scores (threshold sweeps and ROC curves mix the two).
+
+    Returns ``(df, stats)`` with rows scored, elapsed seconds, rows/sec and
+    how many rows the cascade short-circuited.
+    """
+    if model is None:
+        model = load_model()
+
+    start = time.perf_counter()
+    features = model_features(model)
+    X = np.ascontiguousarray(df[features].to_numpy(dtype=np.float32, copy=False))
+    stage1_columns = [features.index(f) for f in cascade.features] if cascade is not None else None
+
+    n_rows = len(X)
+    scores = np.zeros(n_rows, dtype=np.float32)
+    escalated = np.ones(n_rows, dtype=bool)
+    short_circuited = 0
+    for begin in range(0, n_rows, chunk_size):
+        end = min(begin + chunk_size, n_rows)
+        if cascade is None:
+            scores[begin:end] = model.predict_proba(X[begin:end])[:, 1]
+            continue
+
+        block = X[begin:end]
+        stage1 = cascade.stage1_proba(block[:, stage1_columns])
+        escalate = stage1 >= cascade.threshold
+        if escalate.any():
+            scores[begin:end][escalate] = model.predict_proba(block[escalate])[:, 1]
+        escalated[begin:end] = escalate
+        short_circuited += int(len(block) - escalate.sum())
+
+    df[SCORE_COLUMN] = scores
+    df[PREDICTION_COLUMN] = ((scores >= threshold) & escalated).astype(np.int8)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": n_rows,
+        "seconds": elapsed,
+        "rows_per_sec": n_rows / elapsed if elapsed > 0 else float("inf"),
+        "predicted_fraud": int(df[PREDICTION_COLUMN].sum()),
+        "short_circuited": short_circuited,
+    }
+    return df, stats
@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import collections
+import json
+import time
+
+import numpy as np
+
+from scoring import BACKENDS, DEFAULT_THRESHOLD, default_model_path, load_model, model_features
+
+# Usage: python serve.py [--port 8000] [--max-batch-size 256] [--max-wait-ms 2]
+#
+#   POST /score   one transaction object, a list of them, or {"transactions": [...]}
+#   GET  /stats   latency percentiles, throughput and batch sizes
+#   GET  /health
+
+LATENCY_WINDOW = 10_000
+
+
+class MicroBatcher:
+    """Merge concurrent scoring requests into batched booster calls.
+
+    Requests queue their rows; a single worker takes the first waiting
+    request, then keeps collecting until ``max_batch_size`` rows are queued
+    or ``max_wait`` seconds have passed, and scores them with one predict
+    call in a worker thread so the event loop keeps accepting requests.
+    """
+
+    def __init__(self, model, max_batch_size=256, max_wait=0.002):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.batch_sizes = collections.deque(maxlen=LATENCY_WINDOW)
+
+    async def score(self, X):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((X, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            rows = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                rows += len(item[0])
+
+            X = np.concatenate([item[0] for item in pending]) if len(pending) > 1 else pending[0][0]
+            try:
+                scores = await loop.run_in_executor(None, self._predict, X)
+            except Exception as exc:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            self.batch_sizes.append(len(X))
+            offset = 0
+            for rows_in, future in pending:
+                if not future.done():
+                    future.set_result(scores[offset:offset + len(rows_in)])
+                offset += len(rows_in)
+
+    def _predict(self, X):
+        return self.model.predict_proba(X)[:, 1]
+
+
+class ScoringService:
+    def __init__(self, model, batcher, threshold=DEFAULT_THRESHOLD):
+        self.features = model_features(model)
+        self.batcher = batcher
+        self.threshold = threshold
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.scored_rows = 0
+
+    def parse_transactions(self, payload):
+        if isinstance(payload, dict) and "transactions" in payload:
+            payload = payload["transactions"]
+        if isinstance(payload, dict):
+            payload = [payload]
+        if not isinstance(payload, list) or not payload:
+            raise ValueError("expected a transaction object or a non-empty list of them")
+
+        X = np.empty((len(payload), len(self.features)), dtype=np.float32)
+        for i, txn in enumerate(payload):
+            if not isinstance(txn, dict):
+                raise ValueError(f"transaction {i} is not an object")
+            missing = [f for f in self.features if f not in txn]
+            if missing:
+                raise ValueError(f"transaction {i} is missing: {', '.join(missing)}")
+            try:
+                X[i] = [txn[f] for f in self.features]
+            except TypeError:
+                raise ValueError(f"transaction {i} has a non-numeric feature value") from None
+        return X
+
+    async def handle_score(self, body):
+        start = time.perf_counter()
+        X = self.parse_transactions(json.loads(body))
+        scores = await self.batcher.score(X)
+        self.requests += 1
+        self.scored_rows += len(X)
+        self.latencies.append(time.perf_counter() - start)
+        return {
+            "scores": [float(s) for s in scores],
+            "predicted_class": [int(s >= self.threshold) for s in scores],
+        }
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000
+        batches = np.array(self.batcher.batch_sizes)
+        elapsed = time.perf_counter() - self.started
+        return {
+            "requests": self.requests,
+            "rows": self.scored_rows,
+            "latency_window": len(latencies),
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            "rows_per_sec_since_start": self.scored_rows / elapsed if elapsed > 0 else 0.0,
+            "mean_batch_rows": float(batches.mean()) if len(batches) else None,
+        }
+
+
+# --- Minimal HTTP/1.1 on asyncio streams ---
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+async def read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+def make_handler(service):
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except (asyncio.IncompleteReadError, ValueError):
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                try:
+                    if method == "POST" and path == "/score":
+                        status, payload = 200, await service.handle_score(body)
+                    elif method == "GET" and path == "/stats":
+                        status, payload = 200, service.stats()
+                    elif method == "GET" and path == "/health":
+                        status, payload = 200, {"status": "ok"}
+                    else:
+                        status, payload = 404, {"error": f"no route for {method} {path}"}
+                except ValueError as exc:
+                    status, payload = 400, {"error": str(exc)}
+                except Exception as exc:
+                    status, payload = 500, {"error": str(exc)}
+
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(args):
+    model = load_model(args.model, backend=args.backend)
+    batcher = MicroBatcher(model, args.max_batch_size, args.max_wait_ms / 1000)
+    service = ScoringService(model, batcher, args.threshold)
+
+    worker = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(make_handler(service), args.host, args.port)
+    print(f"Scoring with {args.model or default_model_path()} ({args.backend}) on http://{args.host}:{args.port} "
+          f"(max batch {args.max_batch_size}, max wait {args.max_wait_ms} ms)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        worker.cancel()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Online fraud scoring service")
+    parser.add_argument("--model", default=None, help="Model file (default: the app's model)")
+    parser.add_argument("--backend", choices=BACKENDS, default="auto",
+                        help="'auto' runs batches of a few dozen rows on the compiled NumPy forest and larger "
+                             "ones on XGBoost")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    return parser
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(build_parser().parse_args()))
+    except KeyboardInterrupt:
+        pass
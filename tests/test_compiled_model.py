@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from compiled_model import CompiledForest, SmallBatchModel, ulp_distance
+from model_store import BoosterModel
+
+FEATURES = [f"f{i}" for i in range(6)]
+
+
+@pytest.fixture(scope="module")
+def booster():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((5_000, len(FEATURES))).astype(np.float32)
+    y = ((X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(0, 0.5, len(X))) > 1.2).astype(np.int8)
+    # Missing values in training give the splits learned default directions
+    X[rng.random(X.shape) < 0.05] = np.nan
+    dtrain = xgb.DMatrix(X, label=y, feature_names=FEATURES)
+    params = {"objective": "binary:logistic", "max_depth": 5, "eta": 0.3, "base_score": 0.2, "seed": 0}
+    return xgb.train(params, dtrain, num_boost_round=40)
+
+
+@pytest.fixture(scope="module")
+def rows():
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal((20_000, len(FEATURES))).astype(np.float32) * 3
+    X[rng.random(X.shape) < 0.1] = np.nan
+    X[:50] = np.nan
+    return X
+
+
+def test_margins_match_booster_exactly(booster, rows):
+    forest = CompiledForest.from_booster(booster)
+    expected = booster.predict(xgb.DMatrix(rows, feature_names=FEATURES), output_margin=True)
+    np.testing.assert_array_equal(forest.predict_margin(rows), expected)
+
+
+def test_probabilities_within_one_ulp(booster, rows):
+    forest = CompiledForest.from_booster(booster)
+    expected = booster.predict(xgb.DMatrix(rows, feature_names=FEATURES))
+    proba = forest.predict_proba(rows)
+    assert ulp_distance(proba[:, 1], expected).max() <= 1
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0, rtol=1e-6)
+
+
+def test_saved_forest_predicts_the_same(booster, rows, tmp_path):
+    forest = CompiledForest.from_booster(booster)
+    path = tmp_path / "model.forest.npz"
+    forest.save(path)
+    loaded = CompiledForest.load(path)
+    assert loaded.feature_names_in_ == FEATURES
+    np.testing.assert_array_equal(loaded.predict_margin(rows), forest.predict_margin(rows))
+
+
+def test_small_batch_model_routes_by_size(booster, rows):
+    model = BoosterModel(booster)
+    forest = CompiledForest.from_booster(booster)
+    calls = []
+    forest.predict_proba = lambda X, predict=forest.predict_proba: calls.append(len(X)) or predict(X)
+    routed = SmallBatchModel(model, forest, max_rows=8)
+
+    small = routed.predict_proba(rows[:8])
+    large = routed.predict_proba(rows[:100])
+    assert calls == [8]
+    assert ulp_distance(small[:, 1], model.predict_proba(rows[:8])[:, 1]).max() <= 1
+    np.testing.assert_array_equal(large, model.predict_proba(rows[:100]))
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation import CorrelationIndex
+
+COLUMNS = ["a", "b", "c", "d", "Amount", "Class", "constant"]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    df = pd.DataFrame(rng.standard_normal((n, 4)) * [1, 100, 0.01, 5] + [0, 1e4, 3, -2],
+                      columns=["a", "b", "c", "d"]).astype(np.float32)
+    df["d"] = df["d"] + 3 * df["a"]
+    df["Amount"] = rng.exponential(88.0, n).round(2).astype(np.float32)
+    df["Class"] = (rng.random(n) < 0.05).astype(np.int8)
+    df["constant"] = np.float32(7)
+    for col, rate in (("b", 0.05), ("c", 0.3), ("d", 0.01)):
+        df.loc[rng.random(n) < rate, col] = np.nan
+    df.loc[:3_000, "d"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("low, high", [(0.0, 1e9), (10.0, 500.0), (25.0, 26.0), (2_000.0, 3_000.0)])
+@pytest.mark.parametrize("types", [["Legitimate", "Fraudulent"], ["Fraudulent"], ["Legitimate"]])
+def test_matches_pandas_with_missing_values(frame, low, high, types):
+    index = CorrelationIndex(frame, COLUMNS, block_rows=500)
+    labels = [1 if t == "Fraudulent" else 0 for t in types]
+    mask = frame["Amount"].between(np.float32(low), np.float32(high)) & frame["Class"].isin(labels)
+    expected = frame.loc[mask, COLUMNS].corr()
+
+    result = index.correlation(low, high, types)
+    pd.testing.assert_frame_equal(result.isna(), expected.isna())
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), atol=1e-9)
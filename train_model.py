@@ -1,26 +1,356 @@
-import pandas as pd
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
 from sklearn.model_selection import train_test_split
 from xgboost import XGBClassifier
-from sklearn.metrics import classification_report, roc_auc_score
+from sklearn.metrics import average_precision_score, classification_report, roc_auc_score
 import joblib
 
-# Load data
-data = pd.read_csv('data/creditcard.csv')
+from cascade import Cascade, cascade_path
+from evaluation import cross_validate
+from ingest import CSV_ENGINES, peak_rss_mb, read_csv
+from model_store import NATIVE_FORMATS, native_path, read_metadata, save_native
+from preflight import TRAINING_COLUMNS, check_csv
+from schema import FEATURE_COLUMNS
+from tuning import (DEFAULT_BUDGET_SECONDS, DEFAULT_MAX_ROUNDS, SEARCH_METRICS, load_search_params, run_search,
+                    save_search, trained_params)
+
+DATA_PATH = 'data/creditcard.csv'
+MODEL_PATH = 'model/fraud_model.pkl'
+
+
+def train_in_memory(args):
+    # Load data
+    data = read_csv(args.data, args.csv_engine)
+
+    X = data.drop('Class', axis=1)
+    y = data['Class']
+
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=args.test_size, random_state=args.seed)
+
+    # Train model
+    model = XGBClassifier(use_label_encoder=False, eval_metric='logloss',
+                          n_estimators=args.n_estimators, tree_method=args.tree_method,
+                          n_jobs=args.nthread)
+    model.fit(X_train, y_train)
+
+    # Evaluate; ranking metrics need probabilities, not 0/1 labels
+    y_score = model.predict_proba(X_test)[:, 1]
+    y_pred = (y_score >= 0.5).astype(np.int8)
+    auc = roc_auc_score(y_test, y_score)
+    pr_auc = average_precision_score(y_test, y_score)
+    print(classification_report(y_test, y_pred))
+    print("AUC:", auc)
+    print("PR-AUC:", pr_auc)
+
+    metrics = {'auc': auc, 'pr_auc': pr_auc, 'train_rows': len(X_train), 'test_rows': len(X_test),
+               'params': {'tree_method': model.get_xgb_params()['tree_method'] or 'hist'}}
+    if args.cv_folds:
+        metrics.update(run_cross_validation(args, X, y))
+    if args.cascade:
+        stage = fit_cascade(args, model, X_train, y_train, X_test, y_test, y_pred)
+        stage.save(cascade_path(args.model))
+        metrics['cascade_recall_loss'] = stage.stats['recall_loss']
+        metrics['cascade_short_circuit_fraction'] = stage.stats['short_circuit_fraction']
+    return model, metrics
+
+
+def run_cross_validation(args, X, y):
+    params = {'tree_method': args.tree_method or 'hist'}
+
+    def report(fold):
+        print(f"fold {fold['fold']}: AUC {fold['auc']:.5f}  PR-AUC {fold['pr_auc']:.5f}  "
+              f"({fold['val_fraud']} frauds, {fold['seconds']:.1f}s)")
+
+    folds, summary = cross_validate(X, y, params, num_boost_round=args.n_estimators, n_folds=args.cv_folds,
+                                    parallel=args.cv_parallel, seed=args.seed, on_fold=report)
+    print(f"{args.cv_folds}-fold CV in {summary['seconds']:.1f}s ({summary['parallel']} folds at a time): "
+          f"AUC {summary['auc']['mean']:.5f} +/- {summary['auc']['std']:.5f}, "
+          f"PR-AUC {summary['pr_auc']['mean']:.5f} +/- {summary['pr_auc']['std']:.5f}")
+    return {'cv_folds': args.cv_folds, 'cv_auc_mean': summary['auc']['mean'], 'cv_auc_std': summary['auc']['std'],
+            'cv_pr_auc_mean': summary['pr_auc']['mean'], 'cv_pr_auc_std': summary['pr_auc']['std']}
+
+
+def fit_cascade(args, model, X_train, y_train, X_test, y_test, y_pred):
+    # The full model keeps the whole training split. The first stage is fit
+    # on part of it and its threshold set to keep the frauds the full model
+    # catches on the rest; those are in-sample for the full model, so it
+    # catches more of them than on new rows, which only lowers (loosens)
+    # the threshold. Recall loss is measured on the untouched test split.
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=args.test_size,
+                                                  random_state=args.seed, stratify=y_train)
+    val_pred = (model.predict_proba(X_val)[:, 1] >= 0.5).astype(np.int8)
+    stage = Cascade.fit(X_fit, y_fit, X_val, y_val, val_pred,
+                        n_features=args.cascade_features, max_recall_loss=args.cascade_max_recall_loss)
+    stage.stats = stage.evaluate(X_test, y_test, y_pred)
+    print(f"Cascade: {', '.join(stage.features)} (threshold {stage.threshold:.4g})")
+    print(f"Cascade short-circuits {stage.stats['short_circuit_fraction']:.1%} of test rows, "
+          f"recall loss {stage.stats['recall_loss']:.2%} "
+          f"({stage.stats['full_model_recall']:.2%} -> {stage.stats['cascade_recall']:.2%})")
+    return stage
+
+
+def train_external_memory(args):
+    import xgboost as xgb
+    from training_data import CsvChunkIter, iter_split
+
+    # Stream chunks from disk; the quantized pages live in a cache directory
+    # rather than in RAM, so memory stays flat as the file grows
+    with tempfile.TemporaryDirectory(dir=args.cache_dir) as cache_dir:
+        it = CsvChunkIter(args.data, split='train', test_size=args.test_size, seed=args.seed,
+                          chunk_rows=args.chunk_rows, cache_prefix=os.path.join(cache_dir, 'train'),
+                          engine=args.csv_engine)
+        if hasattr(xgb, 'ExtMemQuantileDMatrix'):
+            dtrain = xgb.ExtMemQuantileDMatrix(it, nthread=args.nthread)
+        else:
+            dtrain = xgb.DMatrix(it, nthread=args.nthread)
+
+        params = {
+            'objective': 'binary:logistic',
+            'eval_metric': 'logloss',
+            'tree_method': 'hist',
+            'nthread': args.nthread,
+        }
+        booster = xgb.train(params, dtrain, num_boost_round=args.n_estimators)
+        train_rows = dtrain.num_row()
+        del dtrain
+
+    # Evaluate chunk by chunk; only test labels and scores are kept
+    labels, scores = [], []
+    for X, y in iter_split(args.data, 'test', args.test_size, args.seed, args.chunk_rows,
+                           args.csv_engine):
+        labels.append(y.to_numpy(dtype=np.int8))
+        scores.append(booster.inplace_predict(X).astype(np.float32))
+    y_test = np.concatenate(labels)
+    y_score = np.concatenate(scores)
+    auc = roc_auc_score(y_test, y_score)
+    print(classification_report(y_test, (y_score >= 0.5).astype(np.int8)))
+    print("AUC:", auc)
+
+    # Wrap the booster so the saved artifact matches the in-memory mode
+    model = XGBClassifier()
+    model.load_model(booster.save_raw('json'))
+    return model, {'auc': auc, 'train_rows': train_rows, 'test_rows': len(y_test), 'params': params}
+
+
+def train_incremental(args):
+    import xgboost as xgb
+    from scoring import load_model
+
+    start = time.perf_counter()
+    base_path = args.base_model or native_path(args.model, args.native_format)
+    if not os.path.exists(base_path):
+        base_path = args.model
+    base = load_model(base_path).get_booster()
+
+    # New labeled batch; the holdout is a separate file or a stratified
+    # slice of the batch so the few frauds land on both sides
+    data = read_csv(args.data, args.csv_engine)
+    X = data.drop('Class', axis=1).astype(np.float32)
+    y = data['Class']
+    if args.holdout:
+        holdout = read_csv(args.holdout, args.csv_engine)
+        X_train, y_train = X, y
+        X_val, y_val = holdout.drop('Class', axis=1).astype(np.float32), holdout['Class']
+        if y_val.nunique() < 2:
+            raise ValueError(f"{args.holdout}: the holdout needs both fraud and legitimate rows")
+    else:
+        least = int(y.value_counts().reindex([0, 1], fill_value=0).min())
+        if least < 2:
+            raise ValueError(f"{args.data}: {least} row(s) of the rarer class; a stratified holdout needs "
+                             f"at least 2 of each, so pass --holdout or a larger batch")
+        X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=args.test_size,
+                                                          random_state=args.seed, stratify=y)
+
+    dtrain = xgb.DMatrix(X_train, label=y_train, nthread=args.nthread)
+    dval = xgb.DMatrix(X_val, label=y_val, nthread=args.nthread)
+    base_auc = roc_auc_score(y_val, base.predict(dval))
+
+    # Continue boosting from the existing trees with the params they were
+    # grown with. A native file does not keep them; the metadata records
+    # them, and models saved before it did fall back to a search's
+    # .best_params.json, else the defaults the other modes trained with
+    recorded = read_metadata(base_path).get('params', {}).get('booster')
+    params = dict(recorded) if recorded is not None else load_search_params(base_path) or {}
+    params.update({
+        'objective': 'binary:logistic',
+        'eval_metric': 'auc',
+        'nthread': args.nthread,
+    })
+    if args.tree_method or 'tree_method' not in params:
+        params['tree_method'] = args.tree_method or 'hist'
+    # At most --extra-rounds new trees, cut back to the best holdout AUC
+    booster = xgb.train(params, dtrain, num_boost_round=args.extra_rounds, xgb_model=base,
+                        evals=[(dval, 'holdout')], early_stopping_rounds=args.early_stopping_rounds,
+                        verbose_eval=False)
+    booster = booster[:booster.best_iteration + 1]
+    auc = roc_auc_score(y_val, booster.predict(dval))
+    seconds = time.perf_counter() - start
+
+    added = booster.num_boosted_rounds() - base.num_boosted_rounds()
+    print(f"Base model: {base.num_boosted_rounds()} rounds from {base_path}")
+    print(f"Boosting params: {params}")
+    print(f"Holdout AUC: {base_auc:.6f} -> {auc:.6f} with {added} extra rounds ({seconds:.1f}s)")
+
+    metrics = {'auc': auc, 'base_auc': base_auc, 'train_rows': len(X_train), 'test_rows': len(X_val),
+               'extra_rounds': added, 'seconds': seconds, 'params': params}
+    if auc < base_auc:
+        print("Holdout AUC dropped; keeping the existing model")
+        return None, metrics
+
+    model = XGBClassifier()
+    model.load_model(booster.save_raw('json'))
+    return model, metrics
+
+
+def train_search(args):
+    data = read_csv(args.data, args.csv_engine)
+    X = data.drop('Class', axis=1).astype(np.float32)
+    y = data['Class']
+
+    # Test split as in memory mode; trials early-stop on a validation slice
+    # of the training rows so the test AUC stays unbiased
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=args.test_size, random_state=args.seed)
+    X_train, X_val, y_train, y_val = train_test_split(X_train, y_train, test_size=args.test_size,
+                                                      random_state=args.seed, stratify=y_train)
+
+    def report(trial):
+        print(f"trial {trial['trial']:>3} {trial['status']:>8}  {args.search_metric} {trial[args.search_metric]:.5f}  "
+              f"rounds {trial['best_round']}/{trial['rounds_trained']}  {trial['seconds']:.1f}s")
+
+    best, trials = run_search(X_train, y_train, X_val, y_val, budget_seconds=args.budget_seconds,
+                              parallel=args.parallel_trials, metric=args.search_metric,
+                              max_rounds=args.max_rounds, max_trials=args.max_trials, seed=args.seed,
+                              on_trial=report)
+    booster = best.pop('booster')
+    search = best['search']
+    print(f"{search['trials']} trials ({search['pruned']} pruned) in {search['seconds']:.0f}s, "
+          f"{search['parallel']} at a time; best: trial {best['trial']} with {best['params']}")
+
+    y_score = booster.inplace_predict(X_test.to_numpy())
+    auc = roc_auc_score(y_test, y_score)
+    pr_auc = average_precision_score(y_test, y_score)
+    print(classification_report(y_test, (y_score >= 0.5).astype(np.int8)))
+    print("AUC:", auc)
+    print("PR-AUC:", pr_auc)
+
+    best_path, log_path = save_search(args.model, best, trials)
+    print(f"Saved {best_path} and {log_path}")
+
+    model = XGBClassifier()
+    model.load_model(booster.save_raw('json'))
+    return model, {'auc': auc, 'pr_auc': pr_auc, 'train_rows': len(X_train), 'test_rows': len(X_test),
+                   'search_trials': search['trials'], 'best_rounds': best['best_round'],
+                   'params': trained_params(best['params'])}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Train the fraud detection model")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--csv-engine', choices=CSV_ENGINES, default=None,
+                        help="CSV parser (default: pyarrow when installed, else pandas' C parser)")
+    parser.add_argument('--mode', choices=['memory', 'external', 'incremental', 'search'], default='memory',
+                        help="'external' streams the CSV through XGBoost's external-memory path; "
+                             "'incremental' continues boosting the saved model on a new labeled batch; "
+                             "'search' tunes hyperparameters within --budget-seconds")
+    parser.add_argument('--tree-method', default=None,
+                        help="XGBoost tree method for in-memory training (external mode always uses hist)")
+    parser.add_argument('--nthread', type=int, default=None, help="Training threads (default: all cores)")
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--chunk-rows', type=int, default=250_000)
+    parser.add_argument('--cache-dir', default=None, help="Where external-memory pages are written")
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--base-model', default=None,
+                        help="Model to refresh in incremental mode (default: the native file next to --model)")
+    parser.add_argument('--holdout', default=None,
+                        help="Labeled CSV for incremental validation (default: --test-size of the new batch)")
+    parser.add_argument('--extra-rounds', type=int, default=20, help="Most trees an incremental refresh adds")
+    parser.add_argument('--early-stopping-rounds', type=int, default=5)
+    parser.add_argument('--budget-seconds', type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Wall-clock budget of a search")
+    parser.add_argument('--parallel-trials', type=int, default=None,
+                        help="Search trials run at once (default: one per core)")
+    parser.add_argument('--search-metric', choices=SEARCH_METRICS, default='aucpr',
+                        help="Validation metric trials early-stop and are ranked on")
+    parser.add_argument('--max-rounds', type=int, default=DEFAULT_MAX_ROUNDS, help="Round cap per search trial")
+    parser.add_argument('--max-trials', type=int, default=None)
+    parser.add_argument('--cv-folds', type=int, default=0,
+                        help="Also report stratified k-fold ROC-AUC / PR-AUC (memory mode)")
+    parser.add_argument('--cv-parallel', type=int, default=None, help="Folds trained at once (default: one per core)")
+    parser.add_argument('--cascade', action='store_true',
+                        help="Also train a cheap first-stage model that screens rows before the booster")
+    parser.add_argument('--cascade-features', type=int, default=6)
+    parser.add_argument('--cascade-max-recall-loss', type=float, default=0.0,
+                        help="Share of the booster's caught frauds the first stage may drop on validation")
+    parser.add_argument('--native-format', choices=NATIVE_FORMATS, default='ubj',
+                        help="Format of the native booster file written next to the pickle")
+    return parser
+
+
+def train(args):
+    """Train with the mode selected in ``args``; returns ``(model, metrics)``.
+
+    ``model`` is None when an incremental refresh lowered holdout AUC on the
+    existing model, so nothing should be written.
+    """
+    if args.mode == 'external':
+        return train_external_memory(args)
+    if args.mode == 'incremental':
+        return train_incremental(args)
+    if args.mode == 'search':
+        return train_search(args)
+    return train_in_memory(args)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.cascade and args.mode != 'memory':
+        parser.error("--cascade is only supported with --mode memory")
+    if args.cv_folds and args.mode != 'memory':
+        parser.error("--cv-folds is only supported with --mode memory")
+    # Check the header and a sample of each input before any full parse
+    for path in filter(None, [args.data, args.holdout]):
+        try:
+            check_csv(path, expected_features=FEATURE_COLUMNS, require_features=True,
+                      required=TRAINING_COLUMNS)
+        except (OSError, ValueError) as e:
+            parser.error(f"{path}: {e}")
 
-X = data.drop('Class', axis=1)
-y = data['Class']
+    try:
+        model, metrics = train(args)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Peak RSS: {peak_rss_mb():,.0f} MB")
+    if model is None:
+        return
 
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Save model
+    joblib.dump(model, args.model)
 
-# Train model
-model = XGBClassifier(use_label_encoder=False, eval_metric='logloss')
-model.fit(X_train, y_train)
+    # Native booster + metadata, which the app loads without unpickling.
+    # "booster" holds the params this mode trained with (tuned, or inherited
+    # from the base model); n_estimators is the trees actually kept
+    booster_params = {k: v for k, v in metrics.pop('params').items()
+                      if k not in ('objective', 'eval_metric', 'nthread')}
+    params = {'mode': args.mode, 'n_estimators': model.get_booster().num_boosted_rounds(),
+              'test_size': args.test_size, 'seed': args.seed, 'booster': booster_params}
+    native = save_native(model, args.model, metrics, params, fmt=args.native_format)
+    print(f"Saved {args.model} and {native}")
+    stage_path = cascade_path(args.model)
+    if args.cascade:
+        print(f"Saved {stage_path}")
+    elif os.path.exists(stage_path):
+        # Its threshold was tuned against the replaced model's scores
+        os.remove(stage_path)
+        print(f"Removed {stage_path}; retrain with --cascade to rebuild it")
 
-# Evaluate
-y_pred = model.predict(X_test)
-print(classification_report(y_test, y_pred))
-print("AUC:", roc_auc_score(y_test, y_pred))
 
-# Save model
-joblib.dump(model, 'model/fraud_model.pkl')
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import numpy as np
+import xgboost as xgb
+
+from ingest import iter_csv
+from schema import FEATURE_COLUMNS, LABEL_COLUMN
+
+DEFAULT_CHUNK_ROWS = 250_000
+
+
+def holdout_mask(n_rows, chunk_number, test_size, seed):
+    """Rows of one chunk that belong to the test split.
+
+    Seeded by (seed, chunk number), so every pass over the file assigns
+    each row to the same side without keeping any state between passes.
+    """
+    rng = np.random.default_rng([seed, chunk_number])
+    return rng.random(n_rows) < test_size
+
+
+def iter_split(path, split, test_size, seed, chunk_rows=DEFAULT_CHUNK_ROWS, engine=None):
+    """Yield ``(X, y)`` chunks of the train or test split of a CSV file."""
+    for number, chunk in enumerate(iter_csv(path, chunk_rows, engine)):
+        mask = holdout_mask(len(chunk), number, test_size, seed)
+        if split == "train":
+            mask = ~mask
+        yield chunk.loc[mask, FEATURE_COLUMNS], chunk.loc[mask, LABEL_COLUMN]
+
+
+class CsvChunkIter(xgb.DataIter):
+    """Feed one split of a CSV file to XGBoost a chunk at a time.
+
+    With a ``cache_prefix`` XGBoost pages the quantized data to disk, so
+    only the current chunk is held in memory while the matrix is built.
+    """
+
+    def __init__(self, path, split="train", test_size=0.2, seed=42,
+                 chunk_rows=DEFAULT_CHUNK_ROWS, cache_prefix=None, engine=None):
+        self._path = path
+        self._split = split
+        self._test_size = test_size
+        self._seed = seed
+        self._chunk_rows = chunk_rows
+        self._engine = engine
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = iter_split(self._path, self._split, self._test_size, self._seed, self._chunk_rows,
+                                      self._engine)
+        for X, y in self._chunks:
+            if len(X):
+                input_data(data=X, label=y)
+                return True
+        return False
+
+    def reset(self):
+        self._chunks = None
+
+
+class RowsIter(xgb.DataIter):
+    """Feed selected rows of an in-memory matrix to XGBoost a chunk at a time.
+
+    Only ``chunk_rows`` rows are gathered at once, so building a matrix for
+    a subset (e.g. one cross-validation fold) never copies the whole subset.
+    """
+
+    def __init__(self, X, y, rows, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self._X = X
+        self._y = y
+        self._rows = rows
+        self._chunk_rows = chunk_rows
+        self._offset = 0
+        super().__init__()
+
+    def next(self, input_data):
+        if self._offset >= len(self._rows):
+            return False
+        rows = self._rows[self._offset:self._offset + self._chunk_rows]
+        input_data(data=self._X[rows], label=self._y[rows])
+        self._offset += len(rows)
+        return True
+
+    def reset(self):
+        self._offset = 0
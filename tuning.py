@@ -0,0 +1,211 @@
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SEARCH_METRICS = ("auc", "aucpr")
+DEFAULT_BUDGET_SECONDS = 600
+DEFAULT_MAX_ROUNDS = 1000
+DEFAULT_EARLY_STOPPING_ROUNDS = 30
+PRUNE_EVERY = 10
+PRUNE_WARMUP_TRIALS = 3
+MAX_BIN = 256
+
+
+def search_paths(model_path):
+    """Best-configuration and trial-log files that sit next to the model."""
+    base = os.path.splitext(model_path)[0]
+    return base + ".best_params.json", base + ".trials.jsonl"
+
+
+def sample_params(rng, pos_weight):
+    """One random configuration from the search space."""
+    return {
+        "max_depth": int(rng.integers(3, 11)),
+        "learning_rate": float(math.exp(rng.uniform(math.log(0.02), math.log(0.3)))),
+        "subsample": float(rng.uniform(0.6, 1.0)),
+        "colsample_bytree": float(rng.uniform(0.5, 1.0)),
+        "min_child_weight": float(math.exp(rng.uniform(0.0, math.log(20.0)))),
+        "reg_lambda": float(math.exp(rng.uniform(math.log(0.5), math.log(10.0)))),
+        # Class imbalance: anything from unweighted to fully balanced
+        "scale_pos_weight": float(rng.choice([1.0, math.sqrt(pos_weight), pos_weight])),
+    }
+
+
+class _Pruner:
+    """Median stopping rule over the validation curves seen so far.
+
+    Every ``PRUNE_EVERY`` rounds a trial's best metric is compared with the
+    median best of earlier trials at the same round; below it, the trial is
+    stopped. Nothing is pruned until ``PRUNE_WARMUP_TRIALS`` trials reported.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.history = {}
+
+    def should_prune(self, round_number, best):
+        with self.lock:
+            seen = self.history.setdefault(round_number, [])
+            prune = len(seen) >= PRUNE_WARMUP_TRIALS and best < float(np.median(seen))
+            seen.append(best)
+        return prune
+
+
+def _trial_callback(metric, deadline, pruner, outcome):
+    import xgboost as xgb
+
+    class TrialMonitor(xgb.callback.TrainingCallback):
+        def after_iteration(self, model, epoch, evals_log):
+            history = evals_log["validation"][metric]
+            if time.perf_counter() > deadline:
+                outcome["status"] = "budget"
+                return True
+            if (epoch + 1) % PRUNE_EVERY == 0 and pruner.should_prune(epoch + 1, max(history)):
+                outcome["status"] = "pruned"
+                return True
+            return False
+
+    return TrialMonitor()
+
+
+def run_search(X_train, y_train, X_val, y_val, budget_seconds=DEFAULT_BUDGET_SECONDS, parallel=None,
+               metric="auc", max_rounds=DEFAULT_MAX_ROUNDS, early_stopping_rounds=DEFAULT_EARLY_STOPPING_ROUNDS,
+               max_trials=None, seed=42, on_trial=None):
+    """Random search over booster parameters within a wall-clock budget.
+
+    The training and validation data are quantized once into
+    ``QuantileDMatrix`` objects that every trial shares; trials run
+    ``parallel`` at a time on threads (XGBoost releases the GIL while
+    training) and split the cores between them. Each trial early-stops on
+    ``metric`` over the validation set and is pruned once it falls below
+    the median of earlier trials. No trial starts after the budget is
+    spent, and running ones stop at the deadline with their best round.
+
+    Returns ``(best, trials)`` where ``best`` is the winning trial record
+    with its booster trimmed to the best round under ``"booster"``.
+    """
+    import xgboost as xgb
+
+    if metric not in SEARCH_METRICS:
+        raise ValueError(f"unknown metric {metric!r}, expected one of {', '.join(SEARCH_METRICS)}")
+
+    start = time.perf_counter()
+    deadline = start + budget_seconds
+    cores = os.cpu_count() or 1
+    parallel = max(1, min(parallel or cores, cores))
+    threads = max(1, cores // parallel)
+
+    dtrain = xgb.QuantileDMatrix(X_train, label=y_train, max_bin=MAX_BIN)
+    dval = xgb.QuantileDMatrix(X_val, label=y_val, ref=dtrain)
+    quantize_seconds = time.perf_counter() - start
+
+    y = np.asarray(y_train)
+    pos_weight = float((y == 0).sum() / max(int((y == 1).sum()), 1))
+    rng = np.random.default_rng(seed)
+    pruner = _Pruner()
+    lock = threading.Lock()
+    trials, best = [], {}
+    counter = iter(range(max_trials if max_trials is not None else 1 << 30))
+
+    def next_trial():
+        with lock:
+            if time.perf_counter() >= deadline:
+                return None
+            number = next(counter, None)
+            if number is None:
+                return None
+            return number, sample_params(rng, pos_weight)
+
+    def worker():
+        while True:
+            claimed = next_trial()
+            if claimed is None:
+                return
+            number, sampled = claimed
+            params = {
+                "objective": "binary:logistic",
+                "eval_metric": metric,
+                "nthread": threads,
+                "seed": seed + number,
+                **trained_params(sampled),
+            }
+            outcome = {"status": "complete"}
+            trial_start = time.perf_counter()
+            booster = xgb.train(
+                params, dtrain, num_boost_round=max_rounds, evals=[(dval, "validation")],
+                callbacks=[
+                    xgb.callback.EarlyStopping(early_stopping_rounds, metric_name=metric, data_name="validation",
+                                               maximize=True),
+                    _trial_callback(metric, deadline, pruner, outcome),
+                ],
+                verbose_eval=False,
+            )
+            # best_iteration is set by early stopping; a pruned or budget-cut
+            # trial may stop before it records one
+            best_round = getattr(booster, "best_iteration", booster.num_boosted_rounds() - 1)
+            score = float(booster.best_score) if hasattr(booster, "best_score") else float("nan")
+            record = {
+                "trial": number,
+                "status": outcome["status"],
+                metric: score,
+                "best_round": int(best_round) + 1,
+                "rounds_trained": booster.num_boosted_rounds(),
+                "seconds": time.perf_counter() - trial_start,
+                "params": sampled,
+            }
+            with lock:
+                trials.append(record)
+                if outcome["status"] != "pruned" and score == score and score > best.get(metric, -1.0):
+                    best.clear()
+                    best.update(record, booster=booster[:best_round + 1])
+            if on_trial is not None:
+                on_trial(record)
+
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        for future in [pool.submit(worker) for _ in range(parallel)]:
+            future.result()
+
+    trials.sort(key=lambda t: t["trial"])
+    if not best:
+        raise RuntimeError("no trial finished within the budget")
+    best["search"] = {
+        "metric": metric,
+        "trials": len(trials),
+        "pruned": sum(t["status"] == "pruned" for t in trials),
+        "parallel": parallel,
+        "threads_per_trial": threads,
+        "quantize_seconds": quantize_seconds,
+        "seconds": time.perf_counter() - start,
+    }
+    return best, trials
+
+
+def trained_params(sampled):
+    """Full booster params of a trial: its sampled ones plus the fixed hist setup every trial uses."""
+    return {"tree_method": "hist", "max_bin": MAX_BIN, **sampled}
+
+
+def load_search_params(model_path):
+    """Booster params of the best search trial saved next to the model, or None."""
+    best_path, _ = search_paths(model_path)
+    if not os.path.exists(best_path):
+        return None
+    with open(best_path) as f:
+        best = json.load(f)
+    return trained_params(best["params"])
+
+
+def save_search(model_path, best, trials):
+    """Write the best configuration and the one-line-per-trial log next to the model."""
+    best_path, log_path = search_paths(model_path)
+    with open(best_path, "w") as f:
+        json.dump({k: v for k, v in best.items() if k != "booster"}, f, indent=2)
+    with open(log_path, "w") as f:
+        for trial in trials:
+            f.write(json.dumps(trial) + "\n")
+    return best_path, log_path